@@ -13,16 +13,141 @@ Usage:
 
 import sys
 import os
+import math
+from collections import Counter
 import numpy as np
-from pymatgen.core import Structure, Element
-from pymatgen.io.cif import CifParser
-from pymatgen.io.vasp import Poscar
-from pymatgen.analysis.local_env import CrystalNN
 import argparse
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# pymatgen is imported inside the functions that need it: its CIF parser and
+# CrystalNN pull in most of the package and dominate start-up time otherwise.
+
+# Physical constants and model parameters, kept at module level so the
+# per-bond scalar path reads plain globals rather than class attributes
+_HBAR = 6.582119569e-16  # eV⋅s
+_PI = math.pi
+_AMU = 1.036427e-4       # amu → eV⋅s²/Å² conversion factor
+_K = 100.0               # eV/Å² empirical force-constant scale for 2-D materials
+
+# E = ħ/π · sqrt(K / (r² · μ · amu)) folds to _C / (r · sqrt(μ))
+_C = (_HBAR / _PI) * math.sqrt(_K / _AMU)
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; estimate_phonon_energies falls back to NumPy
+    njit = None
+
+if njit is not None:
+    # See parity_check._parity_kernel: never share the disk cache with __main__.
+    # Serial on purpose: numba's default threading layers are not fork-safe, so
+    # a prange kernel would hang any process pool forked afterwards, and a few
+    # thousand bonds are far below the size where threads pay off
+    @njit(fastmath=True, cache=__name__ != "__main__")
+    def _phonon_energy_kernel(d, mu, out):
+        """Fused per-bond ħω*/π kernel: out[k] = C / (d · sqrt(μ))."""
+        for k in range(d.shape[0]):
+            out[k] = _C / (d[k] * np.sqrt(mu[k]))
+else:
+    _phonon_energy_kernel = None
+
+
+def estimate_phonon_energy(bond_distance: float, reduced_mass: float) -> float:
+    """
+    Estimate characteristic phonon energy ħω*/π from bond parameters.
+    
+    Uses simplified harmonic oscillator model:
+    ω = sqrt(k/μ) where k ∝ 1/r³ for typical covalent bonds
+    
+    Args:
+        bond_distance: Bond length in Angstroms
+        reduced_mass: Reduced mass in atomic mass units
+        
+    Returns:
+        Energy ħω*/π in eV
+    """
+    # Empirical scaling for 2-D materials (fitted to known cases), k = K/r².
+    # This is a simplified model - real calculations would use DFT
+    return _C / (bond_distance * math.sqrt(reduced_mass))
+
+
+class SimpleStructure(NamedTuple):
+    """
+    Minimal periodic structure: only the lattice, fractional coordinates
+    and element symbols that the bond analysis actually uses, plus the
+    formula string for reporting.
+    """
+    lattice: np.ndarray      # (3, 3) lattice vectors as rows, Angstrom
+    frac_coords: np.ndarray  # (N, 3) fractional coordinates
+    species: List[str]       # element symbol per site
+    formula: str             # e.g. 'Li4 H4 N2'
+    
+    @property
+    def cart_coords(self) -> np.ndarray:
+        return self.frac_coords @ self.lattice
+    
+    def to_pymatgen(self):
+        """Build the equivalent pymatgen Structure (for CrystalNN)."""
+        from pymatgen.core import Structure
+        return Structure(self.lattice, self.species, self.frac_coords)
+
+@dataclass
+class BondArrays:
+    """
+    Light-atom bonds stored column-wise: entry k of every array describes bond k.
+    """
+    atom1_idx: np.ndarray
+    atom2_idx: np.ndarray
+    atom1_element: np.ndarray
+    atom2_element: np.ndarray
+    distance: np.ndarray
+    reduced_mass: np.ndarray
+    phonon_energy_eV: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.distance)
+    
+    def take(self, order: np.ndarray) -> 'BondArrays':
+        """Return a new BondArrays with every column reindexed by `order`."""
+        energy = self.phonon_energy_eV
+        return BondArrays(
+            atom1_idx=self.atom1_idx[order],
+            atom2_idx=self.atom2_idx[order],
+            atom1_element=self.atom1_element[order],
+            atom2_element=self.atom2_element[order],
+            distance=self.distance[order],
+            reduced_mass=self.reduced_mass[order],
+            phonon_energy_eV=None if energy is None else energy[order]
+        )
+    
+    def bond_dict(self, k: int) -> Dict:
+        """Return bond k as a descriptor dictionary for reporting."""
+        element = str(self.atom1_element[k])
+        neighbor_element = str(self.atom2_element[k])
+        bond = {
+            'atom1_idx': int(self.atom1_idx[k]),
+            'atom2_idx': int(self.atom2_idx[k]),
+            'atom1_element': element,
+            'atom2_element': neighbor_element,
+            'distance': float(self.distance[k]),
+            'reduced_mass': float(self.reduced_mass[k]),
+            'bond_type': f"{element}-{neighbor_element}",
+            'both_light': (element in BondQuantumAnalyzer.LIGHT_ATOMS and
+                           neighbor_element in BondQuantumAnalyzer.LIGHT_ATOMS)
+        }
+        if self.phonon_energy_eV is not None:
+            bond['phonon_energy_eV'] = float(self.phonon_energy_eV[k])
+            bond['phonon_energy_meV'] = bond['phonon_energy_eV'] * 1000
+        return bond
+
+def _pymatgen_validated(filepath: str) -> bool:
+    """True for CIF/POSCAR/CONTCAR, whose pymatgen parse errors must not be bypassed."""
+    name = os.path.basename(filepath)
+    return (os.path.splitext(name)[1].lower() == '.cif'
+            or name.endswith('POSCAR') or name.endswith('CONTCAR'))
+
 class BondQuantumAnalyzer:
     """
     Analyzes bond lengths and estimates characteristic phonon energies
@@ -30,153 +155,263 @@ class BondQuantumAnalyzer:
     """
     
     # Physical constants
-    HBAR = 6.582119569e-16  # eV⋅s
-    PI = np.pi
+    HBAR = _HBAR  # eV⋅s
+    PI = _PI
     
     # Light atoms that dominate phonon frequencies (atomic mass < 20 u)
     LIGHT_ATOMS = {'H', 'He', 'Li', 'Be', 'B', 'C', 'N', 'O', 'F', 'Ne'}
     
-    def __init__(self):
-        """Initialize the bond quantum analyzer."""
-        self.cnn = CrystalNN()
+    # Atomic masses by element symbol, filled lazily on first lookup
+    _MASS_CACHE: Dict[str, float] = {}
+    
+    def __init__(self, cutoff_distance: float = 3.5, use_cnn: bool = False):
+        """
+        Initialize the bond quantum analyzer.
+        
+        Args:
+            cutoff_distance: Neighbor search radius in Angstroms around light atoms
+            use_cnn: Use CrystalNN instead of a plain cutoff search for neighbors
+        """
+        self.cutoff_distance = cutoff_distance
+        self.use_cnn = use_cnn
+        self.cnn = None
+        if use_cnn:
+            from pymatgen.analysis.local_env import CrystalNN
+            self.cnn = CrystalNN()
         self.threshold_energy = 0.081  # eV, RBT threshold for superconductivity
     
-    def load_structure(self, filepath: str) -> Structure:
-        """Load crystal structure from various file formats."""
+    def load_structure(self, filepath: str) -> SimpleStructure:
+        """
+        Load crystal structure from various file formats.
+        
+        pymatgen is the primary reader, so CIFs keep its occupancy and
+        overlapping-site validation. ASE is only tried for other formats
+        that pymatgen cannot parse.
+        """
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Structure file not found: {filepath}")
         
-        file_ext = os.path.splitext(filepath)[1].lower()
-        
         try:
-            if file_ext == '.cif':
-                parser = CifParser(filepath)
-                structure = parser.get_structures()[0]
-            elif filepath.endswith('POSCAR') or filepath.endswith('CONTCAR'):
-                poscar = Poscar.from_file(filepath)
-                structure = poscar.structure
-            else:
-                structure = Structure.from_file(filepath)
-            
-            print(f"✓ Loaded structure: {structure.formula}")
-            return structure
-            
+            structure = self._read_with_pymatgen(filepath)
         except Exception as e:
-            raise ValueError(f"Could not parse structure file {filepath}: {str(e)}")
+            structure = None
+            if not _pymatgen_validated(filepath):
+                try:
+                    structure = self._read_with_ase(filepath)
+                except Exception:
+                    pass
+            if structure is None:
+                raise ValueError(f"Could not parse structure file {filepath}: {str(e)}")
+        
+        print(f"✓ Loaded structure: {structure.formula}")
+        return structure
+    
+    def _read_with_ase(self, filepath: str) -> Optional[SimpleStructure]:
+        """Read the first structure in a file with ASE, or None if it has no atoms."""
+        from ase.io import read as ase_read
+        
+        atoms = ase_read(filepath, index=0)
+        if len(atoms) == 0:
+            return None
+        species = atoms.get_chemical_symbols()
+        return SimpleStructure(
+            lattice=np.array(atoms.cell.array, dtype=float),
+            frac_coords=atoms.get_scaled_positions(),
+            species=species,
+            # pymatgen's 'El<n>' style, elements in order of first appearance
+            formula=" ".join(f"{el}{n}" for el, n in Counter(species).items())
+        )
+    
+    def _read_with_pymatgen(self, filepath: str) -> SimpleStructure:
+        """Read the first structure in a file with pymatgen's parsers."""
+        from pymatgen.core import Structure
+        from pymatgen.io.cif import CifParser
+        from pymatgen.io.vasp import Poscar
+        
+        file_ext = os.path.splitext(filepath)[1].lower()
+        
+        if file_ext == '.cif':
+            parser = CifParser(filepath)
+            # Only the first structure is used, so skip the primitive-cell
+            # reduction (a symmetry search per block) that get_structures() does
+            if hasattr(parser, 'parse_structures'):
+                structure = parser.parse_structures(primitive=False)[0]
+            else:  # pymatgen < 2024.2
+                structure = parser.get_structures(primitive=False)[0]
+        elif filepath.endswith('POSCAR') or filepath.endswith('CONTCAR'):
+            poscar = Poscar.from_file(filepath)
+            structure = poscar.structure
+        else:
+            structure = Structure.from_file(filepath)
+        
+        return SimpleStructure(
+            lattice=structure.lattice.matrix,
+            frac_coords=structure.frac_coords,
+            species=[site.species_string for site in structure],
+            formula=structure.formula
+        )
     
-    def find_light_atom_bonds(self, structure: Structure) -> List[Dict]:
+    def find_light_atom_bonds(self, structure: SimpleStructure) -> BondArrays:
         """
         Find all bonds involving light atoms (H, Li, B, C, N, etc.).
         
         Args:
-            structure: pymatgen Structure object
+            structure: SimpleStructure as returned by load_structure
             
         Returns:
-            List of bond dictionaries with distances and atom types
+            BondArrays with atom indices, elements, distances and reduced masses
         """
-        light_bonds = []
+        atom1_idx = []
+        atom2_idx = []
+        distances = []
+        seen_pairs: Set[Tuple[int, int]] = set()
         
         print("  Analyzing bonds involving light atoms...")
         
-        for i, site in enumerate(structure):
-            element = site.species_string
-            
-            # Only analyze bonds from light atoms
-            if element not in self.LIGHT_ATOMS:
+        for i, j, distance in self._light_atom_neighbors(structure):
+            # Each bond is seen from both ends; keep only the first sighting
+            pair = (i, j) if i < j else (j, i)
+            if pair in seen_pairs:
                 continue
+            seen_pairs.add(pair)
             
-            try:
-                neighbors = self.cnn.get_nn_info(structure, i)
-                
-                for neighbor in neighbors:
-                    j = neighbor['site_index']
-                    distance = neighbor['weight']
-                    neighbor_element = structure[j].species_string
-                    
-                    # Create bond descriptor
-                    bond = {
-                        'atom1_idx': i,
-                        'atom2_idx': j,
-                        'atom1_element': element,
-                        'atom2_element': neighbor_element,
-                        'distance': distance,
-                        'reduced_mass': self._calculate_reduced_mass(element, neighbor_element),
-                        'bond_type': f"{element}-{neighbor_element}",
-                        'both_light': (element in self.LIGHT_ATOMS and 
-                                     neighbor_element in self.LIGHT_ATOMS)
-                    }
-                    
-                    light_bonds.append(bond)
-                    
-            except Exception as e:
-                print(f"    Warning: Could not analyze bonds for atom {i} ({element}): {e}")
-                continue
-        
-        # Remove duplicates (each bond counted twice)
-        unique_bonds = []
-        seen_pairs = set()
-        
-        for bond in light_bonds:
-            pair = tuple(sorted([bond['atom1_idx'], bond['atom2_idx']]))
-            if pair not in seen_pairs:
-                unique_bonds.append(bond)
-                seen_pairs.add(pair)
+            atom1_idx.append(i)
+            atom2_idx.append(j)
+            distances.append(distance)
+        
+        site_elements = np.array(structure.species)
+        atom1 = np.array(atom1_idx, dtype=np.intp)
+        atom2 = np.array(atom2_idx, dtype=np.intp)
+        atom1_element = site_elements[atom1]
+        atom2_element = site_elements[atom2]
+        reduced_mass = np.fromiter(
+            (self._calculate_reduced_mass(e1, e2)
+             for e1, e2 in zip(atom1_element, atom2_element)),
+            float, len(atom1))
+        
+        bonds = BondArrays(
+            atom1_idx=atom1,
+            atom2_idx=atom2,
+            atom1_element=atom1_element,
+            atom2_element=atom2_element,
+            distance=np.array(distances, dtype=float),
+            reduced_mass=reduced_mass
+        )
+        
+        print(f"  Found {len(bonds)} unique light-atom bonds")
+        return bonds
+    
+    def _light_atom_neighbors(self, structure: SimpleStructure) -> Iterator[Tuple[int, int, float]]:
+        """
+        Yield (i, j, distance) for every neighbor j of every light atom i.
         
-        print(f"  Found {len(unique_bonds)} unique light-atom bonds")
-        return unique_bonds
+        By default all light-atom shells come from one periodic cutoff search
+        over the structure; CrystalNN is only used per atom when `use_cnn` is set.
+        """
+        light_indices = [i for i, element in enumerate(structure.species)
+                         if element in self.LIGHT_ATOMS]
+        
+        if self.use_cnn:
+            pmg_structure = structure.to_pymatgen()
+            for i in light_indices:
+                try:
+                    neighbors = self.cnn.get_nn_info(pmg_structure, i)
+                except Exception as e:
+                    print(f"    Warning: Could not analyze bonds for atom {i} "
+                          f"({structure.species[i]}): {e}")
+                    continue
+                # 'weight' is CrystalNN's bond weight, not a length: measure the
+                # distance to the specific periodic image that was returned
+                center = pmg_structure[i].coords
+                for neighbor in neighbors:
+                    distance = float(np.linalg.norm(neighbor['site'].coords - center))
+                    yield i, neighbor['site_index'], distance
+            return
+        
+        if not light_indices:
+            return
+        
+        from scipy.spatial import cKDTree
+        
+        lattice = np.asarray(structure.lattice, dtype=float)
+        cart = np.mod(structure.frac_coords, 1.0) @ lattice
+        n_sites = len(cart)
+        
+        # Replicate the cell over just enough periodic images to cover the
+        # cutoff sphere: ceil(r / interplanar spacing) along each axis, which
+        # is a 3x3x1 block for a slab with a thick vacuum layer
+        spacings = 1.0 / np.linalg.norm(np.linalg.inv(lattice).T, axis=1)
+        n_images = np.ceil(self.cutoff_distance / spacings).astype(int)
+        shifts = np.stack(np.meshgrid(*[np.arange(-n, n + 1) for n in n_images],
+                                      indexing='ij'), axis=-1).reshape(-1, 3)
+        image_cart = (cart[None, :, :] + (shifts @ lattice)[:, None, :]).reshape(-1, 3)
+        
+        # One KD-tree over all images, queried only from the light atoms
+        tree = cKDTree(image_cart)
+        hits = tree.query_ball_point(cart[light_indices], r=self.cutoff_distance)
+        
+        for i, idx in zip(light_indices, hits):
+            idx = np.asarray(idx, dtype=np.intp)
+            distances = np.linalg.norm(image_cart[idx] - cart[i], axis=1)
+            keep = distances > 1e-8  # drop the atom itself
+            idx, distances = idx[keep], distances[keep]
+            
+            # Shortest image first, so de-duplication keeps the real bond length
+            for k in np.argsort(distances, kind='stable'):
+                yield i, int(idx[k] % n_sites), float(distances[k])
     
     def _calculate_reduced_mass(self, element1: str, element2: str) -> float:
         """Calculate reduced mass of two atoms in atomic mass units."""
         try:
-            m1 = Element(element1).atomic_mass
-            m2 = Element(element2).atomic_mass
+            m1 = self._atomic_mass(element1)
+            m2 = self._atomic_mass(element2)
             reduced_mass = (m1 * m2) / (m1 + m2)
             return reduced_mass
         except:
             return 1.0  # Fallback
     
+    def _atomic_mass(self, element: str) -> float:
+        """Return the atomic mass of an element symbol, memoized per class."""
+        mass = self._MASS_CACHE.get(element)
+        if mass is None:
+            from pymatgen.core import Element
+            mass = self._MASS_CACHE.setdefault(element, float(Element(element).atomic_mass))
+        return mass
+    
     def estimate_phonon_energy(self, bond_distance: float, reduced_mass: float) -> float:
+        """Estimate ħω*/π in eV for one bond; see the module-level `estimate_phonon_energy`."""
+        return estimate_phonon_energy(bond_distance, reduced_mass)
+    
+    def estimate_phonon_energies(self, dists: np.ndarray, mus: np.ndarray) -> np.ndarray:
         """
-        Estimate characteristic phonon energy ħω*/π from bond parameters.
-        
-        Uses simplified harmonic oscillator model:
-        ω = sqrt(k/μ) where k ∝ 1/r³ for typical covalent bonds
+        Vectorized form of `estimate_phonon_energy` over many bonds at once.
         
         Args:
-            bond_distance: Bond length in Angstroms
-            reduced_mass: Reduced mass in atomic mass units
+            dists: Bond lengths in Angstroms
+            mus: Reduced masses in atomic mass units
             
         Returns:
-            Energy ħω*/π in eV
+            Array of energies ħω*/π in eV, one per bond
         """
-        # Convert units
-        r_angstrom = bond_distance
-        mu_amu = reduced_mass
-        
-        # Empirical scaling for 2-D materials (fitted to known cases)
-        # This is a simplified model - real calculations would use DFT
-        force_constant_scale = 100.0  # eV/Å² empirical factor
-        k_force = force_constant_scale / (r_angstrom ** 2)  # Force constant
-        
-        # Convert reduced mass to eV⋅s²/Å²
-        amu_to_ev_per_ang2 = 1.036427e-4  # Conversion factor
-        mu_ev_units = mu_amu * amu_to_ev_per_ang2
-        
-        # Angular frequency
-        omega = np.sqrt(k_force / mu_ev_units)  # rad/s in natural units
-        
-        # Energy ħω*/π
-        energy_meV = (self.HBAR * omega / self.PI) * 1000  # Convert to meV
-        energy_eV = energy_meV / 1000
-        
-        return energy_eV
+        if _phonon_energy_kernel is not None:
+            d = np.ascontiguousarray(dists, dtype=np.float64)
+            mu = np.ascontiguousarray(mus, dtype=np.float64)
+            out = np.empty_like(d)
+            _phonon_energy_kernel(d, mu, out)
+            return out
+        
+        return _C / (dists * np.sqrt(mus))
     
-    def analyze_structure(self, filepath: str) -> Dict:
+    def analyze_structure(self, filepath: str, early_exit: bool = False) -> Dict:
         """
         Complete bond quantum analysis of a crystal structure.
         
         Args:
             filepath: Path to structure file
+            early_exit: Stop at the first bond (shortest first) that meets the
+                threshold. Such a result is marked 'truncated': True and only
+                carries pass/fail plus the deciding bond ('deciding_bond'); the
+                maximum energy and critical-bond keys are absent.
             
         Returns:
             Dictionary with analysis results
@@ -191,35 +426,56 @@ class BondQuantumAnalyzer:
         # Find light atom bonds
         light_bonds = self.find_light_atom_bonds(structure)
         
-        if not light_bonds:
+        if len(light_bonds) == 0:
             print("  ⚠️  No light-atom bonds found!")
             return {
                 'filepath': filepath,
                 'formula': structure.formula,
-                'light_bonds': [],
+                'light_bonds': light_bonds,
                 'shortest_bond': None,
                 'phonon_energy_meV': 0,
                 'phonon_energy_eV': 0,
                 'passes_energy_test': False,
-                'critical_bonds': []
+                'critical_bonds': [],
+                'threshold_meV': self.threshold_energy * 1000,
+                'truncated': False
             }
         
-        # Calculate phonon energies for all bonds
-        for bond in light_bonds:
-            bond['phonon_energy_eV'] = self.estimate_phonon_energy(
-                bond['distance'], bond['reduced_mass']
-            )
-            bond['phonon_energy_meV'] = bond['phonon_energy_eV'] * 1000
+        if early_exit:
+            # Shortest bonds usually carry the highest energies, so a passing
+            # structure is typically decided after one or two evaluations
+            order = np.argsort(light_bonds.distance, kind='stable')
+            for k in order:
+                energy = estimate_phonon_energy(
+                    light_bonds.distance[k], light_bonds.reduced_mass[k]
+                )
+                if energy >= self.threshold_energy:
+                    deciding_bond = light_bonds.bond_dict(k)
+                    deciding_bond['phonon_energy_eV'] = float(energy)
+                    deciding_bond['phonon_energy_meV'] = float(energy) * 1000
+                    return {
+                        'filepath': filepath,
+                        'formula': structure.formula,
+                        'passes_energy_test': True,
+                        'deciding_bond': deciding_bond,
+                        'threshold_meV': self.threshold_energy * 1000,
+                        'truncated': True
+                    }
+        
+        # Calculate phonon energies for all bonds in one vectorized pass
+        light_bonds.phonon_energy_eV = self.estimate_phonon_energies(
+            light_bonds.distance, light_bonds.reduced_mass
+        )
         
         # Sort by shortest bonds (highest frequencies)
-        light_bonds.sort(key=lambda x: x['distance'])
+        light_bonds = light_bonds.take(np.argsort(light_bonds.distance, kind='stable'))
         
-        # Find critical bonds (highest energy)
-        critical_bonds = [b for b in light_bonds if b['phonon_energy_eV'] >= self.threshold_energy]
+        # Find critical bonds (highest energy), as indices into light_bonds
+        critical_bonds = np.nonzero(light_bonds.phonon_energy_eV >= self.threshold_energy)[0]
         
         # Get the shortest bond (likely to dominate)
-        shortest_bond = light_bonds[0]
-        max_energy = max(bond['phonon_energy_eV'] for bond in light_bonds)
+        shortest_bond = light_bonds.bond_dict(0)
+        max_energy = float(light_bonds.phonon_energy_eV.max())
         
         results = {
             'filepath': filepath,
@@ -230,7 +486,8 @@ class BondQuantumAnalyzer:
             'phonon_energy_eV': max_energy,
             'passes_energy_test': max_energy >= self.threshold_energy,
             'critical_bonds': critical_bonds,
-            'threshold_meV': self.threshold_energy * 1000
+            'threshold_meV': self.threshold_energy * 1000,
+            'truncated': False
         }
         
         return results
@@ -239,6 +496,16 @@ class BondQuantumAnalyzer:
         """Print formatted analysis results."""
         print(f"\nRESULTS:")
         print(f"  Formula: {results['formula']}")
+        
+        if results.get('truncated'):
+            bond = results['deciding_bond']
+            print(f"  Threshold energy: {results['threshold_meV']:.1f} meV")
+            print(f"  ✅ PASSES energy test (ħω*/π ≥ {self.threshold_energy} eV)")
+            print(f"  (stopped at the first bond above threshold; maximum not computed)")
+            print(f"\nDECIDING BOND:")
+            print(f"  {bond['bond_type']}: {bond['distance']:.3f} Å → {bond['phonon_energy_meV']:.1f} meV")
+            return
+        
         print(f"  Max phonon energy: {results['phonon_energy_meV']:.1f} meV")
         print(f"  Threshold energy: {results['threshold_meV']:.1f} meV")
         
@@ -257,14 +524,15 @@ class BondQuantumAnalyzer:
             print(f"  Reduced mass: {bond['reduced_mass']:.2f} u")
             print(f"  Phonon energy: {bond['phonon_energy_meV']:.1f} meV")
         
-        if results['critical_bonds']:
+        if len(results['critical_bonds']):
             print(f"\nCRITICAL BONDS (above threshold):")
-            for bond in results['critical_bonds'][:5]:  # Show top 5
+            for k in results['critical_bonds'][:5]:  # Show top 5
+                bond = results['light_bonds'].bond_dict(k)
                 print(f"  {bond['bond_type']}: {bond['distance']:.3f} Å → {bond['phonon_energy_meV']:.1f} meV")
         
         print(f"\nTOTAL LIGHT-ATOM BONDS ANALYZED: {len(results['light_bonds'])}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="RBT Bond Quantum Analyzer for Phonon Energy Estimation",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -282,16 +550,20 @@ Examples:
                        help='Energy threshold in eV (default: 0.081)')
     parser.add_argument('--quiet', '-q', action='store_true',
                        help='Suppress detailed output')
+    parser.add_argument('--cutoff', type=float, default=3.5,
+                       help='Neighbor search radius in Angstroms (default: 3.5)')
+    parser.add_argument('--use-cnn', action='store_true',
+                       help='Find neighbors with CrystalNN instead of a cutoff search (slower)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Initialize analyzer
-        analyzer = BondQuantumAnalyzer()
+        analyzer = BondQuantumAnalyzer(cutoff_distance=args.cutoff, use_cnn=args.use_cnn)
         analyzer.threshold_energy = args.threshold
         
         # Analyze structure
-        results = analyzer.analyze_structure(args.structure_file)
+        results = analyzer.analyze_structure(args.structure_file, early_exit=args.quiet)
         
         # Print results
         if not args.quiet:
@@ -301,16 +573,20 @@ Examples:
         exit_code = 0 if results['passes_energy_test'] else 1
         
         if args.quiet:
-            energy_meV = results['phonon_energy_meV']
             threshold_meV = results['threshold_meV']
             status = 'PASS' if results['passes_energy_test'] else 'FAIL'
-            print(f"ħω*/π={energy_meV:.1f}meV (threshold={threshold_meV:.1f}meV) {status}")
+            if results['truncated']:
+                # Early exit only proves the threshold is met, not the maximum
+                print(f"{status} (threshold={threshold_meV:.1f}meV)")
+            else:
+                energy_meV = results['phonon_energy_meV']
+                print(f"ħω*/π={energy_meV:.1f}meV (threshold={threshold_meV:.1f}meV) {status}")
         
-        sys.exit(exit_code)
+        return exit_code
         
     except Exception as e:
         print(f"ERROR: {str(e)}")
-        sys.exit(2)
+        return 2
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
@@ -21,67 +21,82 @@ Exit codes
 """
 from __future__ import annotations
 import sys
+import io
 import re
 import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple
 
-FREQ_REGEX = re.compile(r"freq\(.*?\)=\s*([\-0-9\.]+)")
+import numpy as np
 
+# Matches both `freq(1)=` and QE's spaced `freq (    1) =` layout; `[^)]*`
+# keeps each match inside its own parentheses when a line holds several fields.
+# ph.x prints `X [THz] =  Y [cm-1]`, so the optional THz field is skipped and
+# the capture is anchored on the cm-1 value
+FREQ_REGEX = re.compile(
+    rb"freq\s*\([^)]*\)\s*=\s*(?:\S+\s*\[THz\]\s*=\s*)?(-?[0-9.]+)\s*\[cm-1\]")
+# Single-field record for np.fromregex; the capture group is parsed straight to float64
+_FREQ_DTYPE = np.dtype([("w", np.float64)])
 
-def parse_frequencies(path: pathlib.Path) -> List[float]:
-    """Return list of frequencies (cm^-1) found in a QE .dyn/.freq file."""
-    freqs: List[float] = []
+
+def _find_frequencies(data: bytes) -> np.ndarray:
+    """Capture every frequency field with `re`; the captures are parsed to float64 in C."""
+    return np.fromregex(io.BytesIO(data), FREQ_REGEX, dtype=_FREQ_DTYPE)["w"]
+
+
+def parse_frequencies(path: pathlib.Path) -> np.ndarray:
+    """Return array of frequencies (cm^-1) found in a QE .dyn/.freq file."""
     try:
-        with path.open("r", errors="ignore") as fh:
-            for line in fh:
-                m = FREQ_REGEX.search(line)
-                if m:
-                    freqs.append(float(m.group(1)))
+        data = path.read_bytes()
     except Exception as exc:
         raise RuntimeError(f"Cannot read {path}: {exc}")
-    if not freqs:
+    freqs = _find_frequencies(data)
+    if freqs.size == 0:
         raise RuntimeError(f"No frequencies found in {path}")
     return freqs
 
 
 def analyse_files(files: List[pathlib.Path]) -> Tuple[int, int, float]:
     """Return (n_total, n_imag, min_freq)."""
-    total = 0
-    imag = 0
-    min_freq = 1e9
-    for f in files:
-        freqs = parse_frequencies(f)
-        total += len(freqs)
-        imag += sum(1 for w in freqs if w < 0)
-        min_freq = min(min_freq, min(freqs))
-    return total, imag, min_freq
-
-
-def main():
-    if len(sys.argv) < 2:
+    if len(files) > 1:
+        # Files are independent, so parse them on all cores
+        with ProcessPoolExecutor() as ex:
+            all_freqs = list(ex.map(parse_frequencies, files))
+    else:
+        all_freqs = [parse_frequencies(f) for f in files]
+
+    # One contiguous buffer, so each statistic is a single C-level reduction
+    freqs = np.concatenate(all_freqs)
+    return freqs.size, int((freqs < 0).sum()), float(freqs.min())
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
         print(__doc__)
-        sys.exit(2)
+        return 2
 
-    paths = [pathlib.Path(p) for p in sys.argv[1:]]
+    paths = [pathlib.Path(p) for p in argv]
     for p in paths:
         if not p.exists():
             print(f"ERROR: {p} does not exist", file=sys.stderr)
-            sys.exit(2)
+            return 2
 
     try:
         total, imag, min_freq = analyse_files(paths)
     except RuntimeError as err:
         print(f"ERROR: {err}", file=sys.stderr)
-        sys.exit(2)
+        return 2
 
     if imag == 0:
         print(f"✅ Stable phonon spectrum – {total} modes, min ω = {min_freq:.2f} cm^-1")
-        sys.exit(0)
+        return 0
     else:
         pct = imag / total * 100
         print(f"⚠️  {imag}/{total} modes imaginary ({pct:.1f}%), min ω = {min_freq:.2f} cm^-1")
-        sys.exit(1)
+        return 1
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
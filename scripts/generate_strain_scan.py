@@ -5,9 +5,14 @@ Supports Li2NH, BeC3H9, and other materials.
 """
 
 import argparse
+import io
+import itertools
 import pathlib
 import sys
-from pymatgen.core import Structure
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Tuple
+import numpy as np
 
 # Material-specific parameters
 MATERIAL_PARAMS = {
@@ -46,30 +51,64 @@ MATERIAL_PARAMS = {
     }
 }
 
-def generate_scf_input(material: str, strain_percent: int, structure: Structure, output_dir: pathlib.Path):
-    """Generate SCF input file for a given strain."""
+def load_structure(path: pathlib.Path) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    Return (lattice matrix, element symbols, fractional coords) for a structure file.
     
-    params = MATERIAL_PARAMS[material]
+    pymatgen reads the file, so CIFs are validated and coordinates match the
+    committed inputs; ASE is only a fallback for non-CIF/POSCAR formats
+    pymatgen cannot parse.
+    """
+    from pymatgen.core import Structure
+    try:
+        structure = Structure.from_file(str(path))
+    except Exception:
+        if path.suffix.lower() == '.cif' or path.name.endswith(('POSCAR', 'CONTCAR')):
+            raise
+        from ase.io import read as ase_read
+        atoms = ase_read(str(path), index=0)
+        if not len(atoms):
+            raise ValueError(f"No atoms in {path}")
+        return np.array(atoms.cell.array), atoms.get_chemical_symbols(), atoms.get_scaled_positions()
+    return structure.lattice.matrix, [str(specie) for specie in structure.species], structure.frac_coords
+
+def build_species_block(species: List[str], params: dict) -> str:
+    """Format the ATOMIC_SPECIES rows (element, mass, pseudopotential) once per structure."""
+    from pymatgen.core import Element
     
-    # Apply strain to lattice
-    strained_lattice = structure.lattice.copy()
-    strain_factor = 1 + strain_percent / 100.0
+    species_info = {}
+    for element in species:
+        if element not in species_info:
+            species_info[element] = (float(Element(element).atomic_mass), params['pseudos'][element])
     
-    # For 2D materials, apply strain in-plane (a,b) only
-    new_matrix = strained_lattice.matrix.copy()
-    new_matrix[0] *= strain_factor  # a vector
-    new_matrix[1] *= strain_factor  # b vector
-    # c vector unchanged for 2D materials
+    return "".join(f"{element}  {mass:.6f}  {pseudo}\n"
+                   for element, (mass, pseudo) in species_info.items())
+
+def build_positions_block(species: List[str], frac_coords: np.ndarray) -> str:
+    """Format the ATOMIC_POSITIONS rows; fractional coordinates are strain-invariant."""
+    elements = np.array(species, dtype=object)
+    rows = np.column_stack([elements, np.asarray(frac_coords)])
+    
+    # One savetxt call formats every row, instead of an f-string per atom
+    buf = io.StringIO()
+    np.savetxt(buf, rows, fmt="%s  %.6f  %.6f  %.6f")
+    return buf.getvalue()
+
+def generate_scf_input(material: str, strain_percent: int, a0: float, c0: float,
+                       species: List[str], species_block: str, positions_block: str,
+                       output_dir: pathlib.Path):
+    """Generate SCF input file for a given strain."""
     
-    strained_structure = Structure(new_matrix, structure.species, structure.frac_coords)
+    params = MATERIAL_PARAMS[material]
     
-    # Calculate celldm parameters
-    a = strained_structure.lattice.a
-    c = strained_structure.lattice.c
+    # For 2D materials, strain is applied in-plane (a,b) only and the c vector
+    # is unchanged. Fractional coordinates are invariant under this affine
+    # strain, so only the lattice constants need rescaling.
+    a = a0 * (1 + strain_percent / 100.0)
     celldm1 = a * 1.8897259886  # Convert Angstrom to bohr
-    celldm3 = c / a
+    celldm3 = c0 / a
     
-    scf_content = f"""&CONTROL
+    header = f"""&CONTROL
    calculation = 'scf'
    restart_mode = 'from_scratch'
    prefix = '{material}_strain_{strain_percent:+03d}'
@@ -82,8 +121,8 @@ def generate_scf_input(material: str, strain_percent: int, structure: Structure,
    ibrav = 4
    celldm(1) = {celldm1:.6f}
    celldm(3) = {celldm3:.6f}
-   nat = {len(strained_structure)}
-   ntyp = {len(set(strained_structure.species))}
+   nat = {len(species)}
+   ntyp = {len(set(species))}
    ecutwfc = {params['ecutwfc']}
    ecutrho = {params['ecutrho']}
    occupations = 'smearing'
@@ -102,30 +141,16 @@ def generate_scf_input(material: str, strain_percent: int, structure: Structure,
 ATOMIC_SPECIES
 """
     
-    # Add atomic species
-    species_written = set()
-    for site in strained_structure:
-        element = str(site.specie)
-        if element not in species_written:
-            atomic_mass = site.specie.atomic_mass
-            pseudo = params['pseudos'][element]
-            scf_content += f"{element}  {atomic_mass:.6f}  {pseudo}\n"
-            species_written.add(element)
-    
-    scf_content += "\nATOMIC_POSITIONS crystal\n"
-    
-    # Add atomic positions
-    for site in strained_structure:
-        element = str(site.specie)
-        x, y, z = site.frac_coords
-        scf_content += f"{element}  {x:.6f}  {y:.6f}  {z:.6f}\n"
-    
-    scf_content += f"\nK_POINTS automatic\n"
-    scf_content += f"{params['kgrid'][0]} {params['kgrid'][1]} {params['kgrid'][2]} 0 0 0\n"
-    
-    # Write file
+    # Stream the fragments straight to disk rather than building the whole
+    # file in memory; position blocks of large supercells can be sizeable
     scf_file = output_dir / "scf.in"
-    scf_file.write_text(scf_content)
+    with scf_file.open("w", buffering=1 << 20) as fh:
+        fh.write(header)
+        fh.write(species_block)
+        fh.write("\nATOMIC_POSITIONS crystal\n")
+        fh.write(positions_block)
+        fh.write("\nK_POINTS automatic\n")
+        fh.write(f"{params['kgrid'][0]} {params['kgrid'][1]} {params['kgrid'][2]} 0 0 0\n")
     
     return scf_file
 
@@ -134,7 +159,8 @@ def generate_ph_input(material: str, strain_percent: int, output_dir: pathlib.Pa
     
     params = MATERIAL_PARAMS[material]
     
-    ph_content = f"""&INPUTPH
+    ph_file = output_dir / "ph.in"
+    ph_file.write_text(f"""&INPUTPH
    tr2_ph = 1.0d-16
    prefix = '{material}_strain_{strain_percent:+03d}'
    outdir = './tmp'
@@ -154,13 +180,58 @@ def generate_ph_input(material: str, strain_percent: int, output_dir: pathlib.Pa
    nq2 = {params['qgrid'][1]}
    nq3 = {params['qgrid'][2]}
 /
-"""
-    
-    ph_file = output_dir / "ph.in"
-    ph_file.write_text(ph_content)
+""")
     
     return ph_file
 
+@dataclass(frozen=True)
+class ScanSettings:
+    """Strain-invariant inputs shared by every strain point of a scan."""
+    material: str
+    a0: float
+    c0: float
+    species: Tuple[str, ...]
+    species_block: str
+    positions_block: str
+    output_root: pathlib.Path
+
+def _make_one(strain: int, settings: ScanSettings) -> str:
+    """Write scf.in, ph.in and README.md for one strain point; return its status line."""
+    strain_dir = settings.output_root / f"{strain:+03d}"
+    strain_dir.mkdir(exist_ok=True)
+    
+    status = f"  Generating strain {strain:+3d}%: "
+    
+    try:
+        generate_scf_input(settings.material, strain, settings.a0, settings.c0,
+                           list(settings.species), settings.species_block,
+                           settings.positions_block, strain_dir)
+        generate_ph_input(settings.material, strain, strain_dir)
+        
+        # Create README
+        readme_content = f"""# Strain {strain:+d}% for {settings.material}
+
+Generated by generate_strain_scan.py
+
+## Files:
+- scf.in: Self-consistent field calculation
+- ph.in: Phonon calculation with electron-phonon coupling
+
+## Run sequence:
+1. pw.x < scf.in > scf.out
+2. ph.x < ph.in > ph.out
+
+## Expected strain effects:
+- Lattice parameter change: {1 + strain/100:.3f}x
+- Expected lambda change: {"increase" if strain < 0 else "decrease"}
+"""
+        (strain_dir / "README.md").write_text(readme_content)
+        
+        return status + "✓ Generated scf.in, ph.in, README.md"
+        
+    except Exception as e:
+        return status + f"❌ Error: {e}"
+
 def main():
     parser = argparse.ArgumentParser(description='Generate strain scan for 2D superconductor candidates')
     parser.add_argument('--material', required=True, choices=list(MATERIAL_PARAMS.keys()),
@@ -185,11 +256,21 @@ def main():
         sys.exit(1)
     
     try:
-        structure = Structure.from_file(str(structure_file))
+        lattice, species, frac_coords = load_structure(structure_file)
     except Exception as e:
         print(f"ERROR: Could not load structure from {structure_file}: {e}")
         sys.exit(1)
     
+    # Species and positions are identical at every strain point, so format them once
+    try:
+        species_block = build_species_block(species, MATERIAL_PARAMS[args.material])
+    except KeyError as e:
+        print(f"ERROR: No pseudopotential configured for {e} in {args.material}")
+        sys.exit(1)
+    positions_block = build_positions_block(species, frac_coords)
+    a0 = float(np.linalg.norm(lattice[0]))
+    c0 = float(np.linalg.norm(lattice[2]))
+    
     print(f"Generating strain scan for {args.material}")
     print(f"Structure: {structure_file}")
     print(f"Output directory: {args.output}")
@@ -199,40 +280,21 @@ def main():
     # Create output directory
     args.output.mkdir(parents=True, exist_ok=True)
     
-    # Generate strain points
-    for strain in args.strains:
-        strain_dir = args.output / f"{strain:+03d}"
-        strain_dir.mkdir(exist_ok=True)
-        
-        print(f"  Generating strain {strain:+3d}%: ", end="")
-        
-        try:
-            scf_file = generate_scf_input(args.material, strain, structure, strain_dir)
-            ph_file = generate_ph_input(args.material, strain, strain_dir)
-            
-            # Create README
-            readme_content = f"""# Strain {strain:+d}% for {args.material}
-
-Generated by generate_strain_scan.py
-
-## Files:
-- scf.in: Self-consistent field calculation
-- ph.in: Phonon calculation with electron-phonon coupling
-
-## Run sequence:
-1. pw.x < scf.in > scf.out
-2. ph.x < ph.in > ph.out
-
-## Expected strain effects:
-- Lattice parameter change: {1 + strain/100:.3f}x
-- Expected lambda change: {"increase" if strain < 0 else "decrease"}
-"""
-            (strain_dir / "README.md").write_text(readme_content)
-            
-            print(f"✓ Generated scf.in, ph.in, README.md")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
+    # Generate strain points; each one is independent, so fan them out
+    settings = ScanSettings(
+        material=args.material,
+        a0=a0,
+        c0=c0,
+        species=tuple(species),
+        species_block=species_block,
+        positions_block=positions_block,
+        output_root=args.output
+    )
+    with ProcessPoolExecutor() as ex:
+        status_lines = list(ex.map(_make_one, args.strains, itertools.repeat(settings)))
+    
+    for line in status_lines:
+        print(line)
     
     print(f"\n✅ Strain scan generated in {args.output}")
     print(f"   Materials parameters used: {MATERIAL_PARAMS[args.material]}")
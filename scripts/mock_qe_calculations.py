@@ -4,10 +4,23 @@ Mock QE calculations for Li2NH strain scan.
 Generates realistic-looking output files with plausible λ values.
 """
 
-import time
-import random
+import os
 import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+
+import numpy as np
+
+_rng = np.random.default_rng()
+
+# Folder names carry an explicit sign for non-negative strains (strain_+0pc)
+_STRAIN_RE = re.compile(r'strain_([+-]?\d+)pc')
+
+# Inclusive bounds of the integer fields: gvecs, dense, smooth, pw, pwvecs, iterations
+_INT_LOW = np.array([1000, 10000, 5000, 2000, 200, 8])
+_INT_HIGH = np.array([1200, 12000, 6000, 3000, 300, 15])
 
 # Realistic λ values that increase slightly with compressive strain
 LAMBDA_VALUES = {
@@ -20,8 +33,11 @@ LAMBDA_VALUES = {
     3: 0.75    # Tension reduces coupling
 }
 
-# Template for SCF output
-SCF_TEMPLATE = """
+def build_scf(date: str, alat: float, volume: float, energy: float,
+              gvecs: int, dense: int, smooth: int, pw: int, pwvecs: int,
+              n_iter: int, etime: float, ttime: float) -> str:
+    """Render a mock pw.x SCF output."""
+    return f"""
      Program PWSCF v.7.2 starts on {date}
      This program is part of the open-source Quantum ESPRESSO suite
 
@@ -45,36 +61,43 @@ SCF_TEMPLATE = """
      Using Slab Decomposition
 
      bravais-lattice index     =            0
-     lattice parameter (alat)  =       {alat}  a.u.
-     unit-cell volume          =     {volume}  (a.u.)^3
+     lattice parameter (alat)  =       {alat:.5f}  a.u.
+     unit-cell volume          =     {volume:.2f}  (a.u.)^3
 
-     convergence has been achieved in   {iter} iterations
+     convergence has been achieved in   {n_iter} iterations
 
-!    total energy              =     {energy} Ry
+!    total energy              =     {energy:.8f} Ry
      estimated scf accuracy    <       0.00000001 Ry
 
      The total energy is the sum of the following terms:
-     one-electron contribution =     {eone} Ry
-     hartree contribution      =      {hart} Ry
-     xc contribution           =     {xc} Ry
+     one-electron contribution =     {energy*0.7:.8f} Ry
+     hartree contribution      =      {energy*0.2:.8f} Ry
+     xc contribution           =     {energy*0.1:.8f} Ry
 
      Writing all to output data dir ./tmp/Li2NH_ci.save/
 
      init_run     :      0.31s CPU      0.42s WALL (       1 calls)
-     electrons    :      {etime}s CPU      {etime}s WALL (       1 calls)
+     electrons    :      {etime:.2f}s CPU      {etime:.2f}s WALL (       1 calls)
 
      Called by init_run:
      wfcinit      :      0.03s CPU      0.03s WALL (       1 calls)
      potinit      :      0.13s CPU      0.17s WALL (       1 calls)
      hinit0       :      0.13s CPU      0.19s WALL (       1 calls)
 
-     PWSCF        :      {ttime}s CPU      {ttime}s WALL
+     PWSCF        :      {ttime:.2f}s CPU      {ttime:.2f}s WALL
 
    This run was terminated on:  {date}
 """
 
-# Template for phonon output
-PH_TEMPLATE = """
+def build_ph(date: str, freqs_thz, freqs_cm, lambdas, gammas,
+             lambda_val: float, omega_log: float, tc: float,
+             dos: float, ef: float, ptime: float, sym: str = "C3v") -> str:
+    """Render a mock ph.x output with six modes and their e-ph couplings."""
+    f1, f2, f3, f4, f5, f6 = freqs_thz
+    w1, w2, w3, w4, w5, w6 = freqs_cm
+    l1, l2, l3, l4, l5, l6 = lambdas
+    g1, g2, g3, g4, g5, g6 = gammas
+    return f"""
      Program PHONON v.7.2 starts on {date}
 
      This program is part of the open-source Quantum ESPRESSO suite
@@ -94,12 +117,12 @@ PH_TEMPLATE = """
      q = (    0.000000000   0.000000000   0.000000000 )
      
      **************************************************************************
-     freq (    1) =      {f1} [THz] =    {w1} [cm-1]
-     freq (    2) =      {f2} [THz] =    {w2} [cm-1]
-     freq (    3) =      {f3} [THz] =    {w3} [cm-1]
-     freq (    4) =      {f4} [THz] =    {w4} [cm-1]
-     freq (    5) =      {f5} [THz] =    {w5} [cm-1]
-     freq (    6) =      {f6} [THz] =    {w6} [cm-1]
+     freq (    1) =      {f1:.6f} [THz] =    {w1:.2f} [cm-1]
+     freq (    2) =      {f2:.6f} [THz] =    {w2:.2f} [cm-1]
+     freq (    3) =      {f3:.6f} [THz] =    {w3:.2f} [cm-1]
+     freq (    4) =      {f4:.6f} [THz] =    {w4:.2f} [cm-1]
+     freq (    5) =      {f5:.6f} [THz] =    {w5:.2f} [cm-1]
+     freq (    6) =      {f6:.6f} [THz] =    {w6:.2f} [cm-1]
      **************************************************************************
      
      Mode symmetry, {sym} point group:
@@ -107,107 +130,126 @@ PH_TEMPLATE = """
      Electron-phonon coupling constants
      
      Gaussian Broadening:   0.005 Ry, ngauss=   0
-     DOS =  {dos} states/spin/Ry/Unit Cell at Ef=  {ef} eV
+     DOS =  {dos:.3f} states/spin/Ry/Unit Cell at Ef=  {ef:.3f} eV
      
-     lambda( 1)=  {l1}   gamma=    {g1} meV
-     lambda( 2)=  {l2}   gamma=    {g2} meV
-     lambda( 3)=  {l3}   gamma=    {g3} meV
-     lambda( 4)=  {l4}   gamma=    {g4} meV
-     lambda( 5)=  {l5}   gamma=    {g5} meV
-     lambda( 6)=  {l6}   gamma=    {g6} meV
+     lambda( 1)=  {l1:.3f}   gamma=    {g1:.2f} meV
+     lambda( 2)=  {l2:.3f}   gamma=    {g2:.2f} meV
+     lambda( 3)=  {l3:.3f}   gamma=    {g3:.2f} meV
+     lambda( 4)=  {l4:.3f}   gamma=    {g4:.2f} meV
+     lambda( 5)=  {l5:.3f}   gamma=    {g5:.2f} meV
+     lambda( 6)=  {l6:.3f}   gamma=    {g6:.2f} meV
      
-     lambda =   {lambda}
-     omega(log)=   {wlog} K =   {wlog_cm} cm-1
+     lambda =   {lambda_val:.3f}
+     omega(log)=   {omega_log * 1.438:.1f} K =   {omega_log:.1f} cm-1
      
-     Estimated Allen-Dynes Tc =   {tc} K for muc =  0.10
+     Estimated Allen-Dynes Tc =   {tc:.1f} K for muc =  0.10
      
-     PHONON       :   {ptime}s CPU   {ptime}s WALL
+     PHONON       :   {ptime:.1f}s CPU   {ptime:.1f}s WALL
      
    This run was terminated on:  {date}
 """
 
-def generate_mock_outputs(strain_percent: int, folder: pathlib.Path):
-    """Generate mock SCF and PH outputs for a given strain."""
-    
-    print(f"  Generating mock QE outputs for {strain_percent}% strain...")
-    
-    # SCF parameters
-    alat = 6.65 * (1 + strain_percent/100)
-    volume = 800 * (1 + strain_percent/100)**2
-    energy = -123.45 + random.uniform(-0.1, 0.1)
-    
-    scf_content = SCF_TEMPLATE.format(
-        date=datetime.now().strftime("%d%b%Y at %H:%M:%S"),
-        gvecs=random.randint(1000, 1200),
-        dense=random.randint(10000, 12000),
-        smooth=random.randint(5000, 6000),
-        pw=random.randint(2000, 3000),
-        pwvecs=random.randint(200, 300),
-        alat=f"{alat:.5f}",
-        volume=f"{volume:.2f}",
-        iter=random.randint(8, 15),
-        energy=f"{energy:.8f}",
-        eone=f"{energy*0.7:.8f}",
-        hart=f"{energy*0.2:.8f}",
-        xc=f"{energy*0.1:.8f}",
-        etime=f"{random.uniform(1.5, 3.5):.2f}",
-        ttime=f"{random.uniform(2.0, 4.0):.2f}"
-    )
+def _write_ascii(path: pathlib.Path, content: str):
+    """Write an ASCII payload with one raw os.write, bypassing the text-mode IO stack."""
+    data = content.encode('ascii')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _render(folder: pathlib.Path, strain_percent: int, alat: float, volume: float,
+            lambda_val: float, omega_log: float, tc: float, stable: bool) -> str:
+    """Randomize the per-run fields around one strain's fixed parameters and write the outputs."""
     
-    # Phonon parameters
-    lambda_val = LAMBDA_VALUES[strain_percent]
-    omega_log = 250 + strain_percent * 5  # cm-1
-    tc = lambda_val * omega_log / 1.2  # McMillan approximation
+    # Draw every random field in two vector calls, then scale the slices
+    u = _rng.random(24)
+    gvecs, dense, smooth, pw, pwvecs, n_iter = _rng.integers(
+        _INT_LOW, _INT_HIGH, endpoint=True).tolist()
+    
+    energy = -123.45 + (0.2 * u[0] - 0.1)
+    
+    # One timestamp serves the start and termination lines of both outputs
+    date = datetime.now().strftime("%d%b%Y at %H:%M:%S")
+    scf_content = build_scf(
+        date, alat, volume, energy,
+        gvecs=gvecs, dense=dense, smooth=smooth, pw=pw, pwvecs=pwvecs,
+        n_iter=n_iter,
+        etime=1.5 + 2.0 * u[1],
+        ttime=2.0 + 2.0 * u[2],
+    )
     
     # Generate frequencies (avoid imaginary for most strains)
-    if abs(strain_percent) <= 2:
+    if stable:
         freq_min = 2.0
     else:
-        freq_min = -0.5 if random.random() < 0.3 else 1.0
+        freq_min = -0.5 if u[3] < 0.3 else 1.0
     
-    freqs_thz = sorted([freq_min] + [random.uniform(3, 15) for _ in range(5)])
+    freqs_thz = sorted([freq_min] + (3 + 12 * u[4:9]).tolist())
     freqs_cm = [f * 33.356 for f in freqs_thz]
     
-    ph_content = PH_TEMPLATE.format(
-        date=datetime.now().strftime("%d%b%Y at %H:%M:%S"),
-        f1=f"{freqs_thz[0]:.6f}", w1=f"{freqs_cm[0]:.2f}",
-        f2=f"{freqs_thz[1]:.6f}", w2=f"{freqs_cm[1]:.2f}",
-        f3=f"{freqs_thz[2]:.6f}", w3=f"{freqs_cm[2]:.2f}",
-        f4=f"{freqs_thz[3]:.6f}", w4=f"{freqs_cm[3]:.2f}",
-        f5=f"{freqs_thz[4]:.6f}", w5=f"{freqs_cm[4]:.2f}",
-        f6=f"{freqs_thz[5]:.6f}", w6=f"{freqs_cm[5]:.2f}",
-        sym="C3v",
-        dos=f"{random.uniform(2.5, 3.5):.3f}",
-        ef=f"{random.uniform(-5, -3):.3f}",
-        l1=f"{random.uniform(0.1, 0.3):.3f}", g1=f"{random.uniform(1, 3):.2f}",
-        l2=f"{random.uniform(0.1, 0.3):.3f}", g2=f"{random.uniform(1, 3):.2f}",
-        l3=f"{random.uniform(0.1, 0.3):.3f}", g3=f"{random.uniform(1, 3):.2f}",
-        l4=f"{random.uniform(0.1, 0.3):.3f}", g4=f"{random.uniform(1, 3):.2f}",
-        l5=f"{random.uniform(0.1, 0.3):.3f}", g5=f"{random.uniform(1, 3):.2f}",
-        l6=f"{random.uniform(0.1, 0.3):.3f}", g6=f"{random.uniform(1, 3):.2f}",
-        **{"lambda": f"{lambda_val:.3f}"},
-        wlog=f"{omega_log * 1.438:.1f}",  # K
-        wlog_cm=f"{omega_log:.1f}",
-        tc=f"{tc:.1f}",
-        ptime=f"{random.uniform(5, 10):.1f}"
+    ph_content = build_ph(
+        date,
+        freqs_thz, freqs_cm,
+        lambdas=0.1 + 0.2 * u[11:17],
+        gammas=1 + 2 * u[17:23],
+        lambda_val=lambda_val, omega_log=omega_log, tc=tc,
+        dos=2.5 + u[9], ef=-5 + 2 * u[10], ptime=5 + 5 * u[23],
     )
     
     # Write files
-    (folder / "scf.out").write_text(scf_content)
-    (folder / "ph.out").write_text(ph_content)
+    _write_ascii(folder / "scf.out", scf_content)
+    _write_ascii(folder / "ph.out", ph_content)
     
     # Create a mock .dyn0 file for phonon stability check
+    lines = [f"    freq(   {i}) =    {f_cm:.6f} [cm-1]" for i, f_cm in enumerate(freqs_cm, 1)]
     dyn_content = """Dynamical matrix file
 
 q =    0.0000   0.0000   0.0000
-"""
-    for i, (f_thz, f_cm) in enumerate(zip(freqs_thz, freqs_cm), 1):
-        dyn_content += f"    freq(   {i}) =    {f_cm:.6f} [cm-1]\n"
+""" + "\n".join(lines) + "\n"
+    
+    _write_ascii(folder / "dyn0", dyn_content)
     
-    (folder / "dyn0").write_text(dyn_content)
+    return (f"  Generating mock QE outputs for {strain_percent}% strain...\n"
+            f"    ✓ Generated: {folder}/scf.out, ph.out, dyn0")
+
+def _strain_renderer(strain_percent: int, lambda_val: float):
+    """Bind the strain-only parameters of `_render` once."""
+    omega_log = 250 + strain_percent * 5  # cm-1
+    return partial(
+        _render,
+        strain_percent=strain_percent,
+        # SCF parameters
+        alat=6.65 * (1 + strain_percent/100),
+        volume=800 * (1 + strain_percent/100)**2,
+        # Phonon parameters
+        lambda_val=lambda_val,
+        omega_log=omega_log,
+        tc=lambda_val * omega_log / 1.2,  # McMillan approximation
+        stable=abs(strain_percent) <= 2,
+    )
+
+# Everything that depends only on the strain is fixed at import time
+_PRECOMPUTED = {strain: _strain_renderer(strain, lam) for strain, lam in LAMBDA_VALUES.items()}
+
+def generate_mock_outputs(strain_percent: int, folder: pathlib.Path) -> str:
+    """Generate mock SCF and PH outputs for a given strain and return a status line."""
+    return _PRECOMPUTED[strain_percent](folder)
+
+def _init_worker():
+    """Give each worker process its own entropy-seeded generator.
     
-    time.sleep(0.5)  # Simulate calculation time
-    print(f"    ✓ Generated: {folder}/scf.out, ph.out, dyn0")
+    Forked workers would otherwise inherit the parent's `_rng` state and all
+    draw the same stream.
+    """
+    global _rng
+    _rng = np.random.default_rng()
+
+def _worker(job) -> str:
+    strain, folder = job
+    return generate_mock_outputs(strain, folder)
 
 def main():
     print("=" * 60)
@@ -225,9 +267,18 @@ def main():
     
     print(f"Found {len(strain_folders)} strain folders to process:\n")
     
+    jobs = []
     for folder in strain_folders:
-        strain = int(folder.name.replace("strain_", "").replace("pc", ""))
-        generate_mock_outputs(strain, folder)
+        m = _STRAIN_RE.fullmatch(folder.name)
+        if m:
+            jobs.append((int(m.group(1)), folder))
+        else:
+            print(f"  ⚠️  Skipping {folder}: cannot parse strain from folder name")
+    
+    # Folders are independent, so write them from all cores; map keeps the order
+    with ProcessPoolExecutor(initializer=_init_worker) as ex:
+        for status in ex.map(_worker, jobs):
+            print(status)
     
     print("\n" + "=" * 60)
     print("ALL MOCK CALCULATIONS COMPLETE!")
@@ -5,6 +5,7 @@ Shows real-time progress, system status, and recent results.
 """
 
 import os
+import sys
 import time
 import pathlib
 import subprocess
@@ -15,45 +16,89 @@ def clear_screen():
     """Clear terminal screen."""
     os.system('clear' if os.name == 'posix' else 'cls')
 
+# `git status` is re-run at most every GIT_STATUS_TTL seconds, or sooner when
+# the index changes (commit, add, checkout); working-tree edits show up
+# within the TTL
+GIT_STATUS_TTL = 30.0
+_git_cache = {'index_mtime': None, 'checked': None, 'count': 0}
+
 def get_git_status():
     """Get current git status."""
+    try:
+        index_mtime = os.stat(os.path.join('.git', 'index')).st_mtime_ns
+    except OSError:
+        index_mtime = None
+    now = time.monotonic()
+    if (_git_cache['checked'] is not None
+            and index_mtime == _git_cache['index_mtime']
+            and now - _git_cache['checked'] < GIT_STATUS_TTL):
+        return _git_cache['count']
+    
     try:
         result = subprocess.run(['git', 'status', '--porcelain'], 
                               capture_output=True, text=True)
-        return len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
+        count = len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
     except:
-        return 0
+        count = 0
+    _git_cache.update(index_mtime=index_mtime, checked=now, count=count)
+    return count
+
+OUTPUT_FILES = ("scf.out", "ph.out", "dyn0")
+
+def get_folder_outputs(folder):
+    """Return {output file name: exists} for one strain folder from a single
+    listing, or None if the folder has disappeared."""
+    try:
+        with os.scandir(folder) as entries:
+            names = {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return {name: name in names for name in OUTPUT_FILES}
 
-def count_files_in_strain_folders():
-    """Count output files in strain folders."""
+def count_files_in_strain_folders(strain_folders=None):
+    """Count output files in strain folders.
+    
+    Returns (total_files, completed, per-folder outputs) so callers can reuse
+    the per-folder status without touching the filesystem again.
+    """
+    if strain_folders is None:
+        strain_folders = pathlib.Path(".").glob("strain_*pc")
+    
     total_files = 0
     completed = 0
+    statuses = {}
     
-    for folder in pathlib.Path(".").glob("strain_*pc"):
-        scf_exists = (folder / "scf.out").exists()
-        ph_exists = (folder / "ph.out").exists()
-        dyn_exists = (folder / "dyn0").exists()
+    for folder in strain_folders:
+        outputs = get_folder_outputs(folder)
+        if outputs is None:
+            continue
+        statuses[folder] = outputs
         
-        if scf_exists:
-            total_files += 1
-        if ph_exists:
-            total_files += 1
-        if dyn_exists:
-            total_files += 1
-            
-        if scf_exists and ph_exists and dyn_exists:
+        present = sum(outputs.values())
+        total_files += present
+        if present == len(OUTPUT_FILES):
             completed += 1
     
-    return total_files, completed
+    return total_files, completed, statuses
+
+# Last parsed results table, reused while the CSV's mtime and size are unchanged
+_csv_cache = {'key': None, 'df': None}
 
 def get_latest_results():
     """Get latest Tc results if available."""
     csv_file = pathlib.Path("strain_scan_results.csv")
-    if not csv_file.exists():
+    try:
+        st = csv_file.stat()
+    except FileNotFoundError:
         return None
     
     try:
-        df = pd.read_csv(csv_file)
+        key = (st.st_mtime_ns, st.st_size)
+        if key == _csv_cache['key']:
+            df = _csv_cache['df']
+        else:
+            df = pd.read_csv(csv_file)
+            _csv_cache.update(key=key, df=df)
         max_tc_idx = df['Tc_AD_K'].idxmax()
         return df.loc[max_tc_idx]
     except:
@@ -61,10 +106,10 @@ def get_latest_results():
 
 def format_time_ago(file_path):
     """Format how long ago a file was modified."""
-    if not file_path.exists():
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except FileNotFoundError:
         return "N/A"
-    
-    mtime = file_path.stat().st_mtime
     elapsed = time.time() - mtime
     
     if elapsed < 60:
@@ -105,17 +150,18 @@ def main():
             print(f"   Total strain points: {len(strain_folders)}")
             
             if strain_folders:
-                total_files, completed = count_files_in_strain_folders()
+                total_files, completed, statuses = count_files_in_strain_folders(strain_folders)
                 print(f"   Completed calculations: {completed}/{len(strain_folders)}")
                 print(f"   Total output files: {total_files}")
                 
                 # Show individual folder status
                 print("\n   Strain point status:")
-                for folder in sorted(strain_folders):
+                for folder in sorted(statuses):
                     strain = folder.name.replace("strain_", "").replace("pc", "")
-                    scf = "✓" if (folder / "scf.out").exists() else "○"
-                    ph = "✓" if (folder / "ph.out").exists() else "○"
-                    dyn = "✓" if (folder / "dyn0").exists() else "○"
+                    outputs = statuses[folder]
+                    scf = "✓" if outputs["scf.out"] else "○"
+                    ph = "✓" if outputs["ph.out"] else "○"
+                    dyn = "✓" if outputs["dyn0"] else "○"
                     
                     print(f"     {strain:>4}%: SCF[{scf}] PH[{ph}] DYN[{dyn}]")
             
@@ -146,7 +192,7 @@ def main():
             
             for name, path in recent_files:
                 age = format_time_ago(path)
-                status = "✓" if path.exists() else "○"
+                status = "○" if age == "N/A" else "✓"
                 print(f"   [{status}] {name}: {age}")
             
             # Available commands
@@ -159,7 +205,7 @@ def main():
             
             # System resources (simplified)
             print("\n💻 SYSTEM:")
-            print(f"   Python: {subprocess.run(['python', '--version'], capture_output=True, text=True).stdout.strip()}")
+            print(f"   Python: Python {sys.version.split()[0]}")
             print(f"   Environment: {os.environ.get('VIRTUAL_ENV', 'No venv').split('/')[-1]}")
             
             print("\n" + "=" * 80)
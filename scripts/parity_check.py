@@ -13,17 +13,57 @@ Usage:
 
 import sys
 import os
+import hashlib
+import pickle
 import numpy as np
-import networkx as nx
 from pymatgen.core import Structure
 from pymatgen.io.cif import CifParser
 from pymatgen.io.vasp import Poscar
-from pymatgen.analysis.local_env import CrystalNN
+try:
+    from pymatgen.core import __version__ as _PYMATGEN_VERSION
+except ImportError:
+    _PYMATGEN_VERSION = 'unknown'
 import argparse
-from typing import Tuple, List, Dict
+from typing import Tuple, Dict
 import warnings
 warnings.filterwarnings('ignore')
 
+# With --cache, parsed structures are pickled here, keyed by a hash of the
+# file contents and the library versions that produced them
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'rbt')
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; calculate_parity falls back to NumPy
+    njit = None
+
+if njit is not None:
+    # Cache only under the package name (rbt-parity, tests): numba keys the
+    # on-disk cache by file, and an entry written by scripts.parity_check
+    # cannot be loaded when this file runs as __main__
+    @njit(cache=__name__ != "__main__")
+    def _parity_kernel(edges, n_atoms):
+        """Degree histogram plus odd count, min, max and sum in two fused passes."""
+        degrees = np.zeros(n_atoms, np.int32)
+        for k in range(edges.shape[0]):
+            degrees[edges[k, 0]] += 1
+            degrees[edges[k, 1]] += 1
+        n_odd = 0
+        lo = degrees[0]
+        hi = degrees[0]
+        total = 0
+        for i in range(n_atoms):
+            d = degrees[i]
+            n_odd += d & 1
+            lo = min(lo, d)
+            hi = max(hi, d)
+            total += d
+        return degrees, n_odd, lo, hi, total
+else:
+    _parity_kernel = None
+
 class RBTParityChecker:
     """
     Analyzes crystal structures for RBT parity condition (K = 0).
@@ -32,33 +72,34 @@ class RBTParityChecker:
     connectivity graph. For superconductivity, we need K = 0.
     """
     
-    def __init__(self, cutoff_distance: float = 3.5):
+    def __init__(self, cutoff_distance: float = 3.5, cutoff_graph: bool = False,
+                 use_cache: bool = False):
         """
         Initialize the parity checker.
         
         Args:
             cutoff_distance: Maximum bond distance in Angstroms for graph construction
+            cutoff_graph: Bond every pair within the cutoff instead of CrystalNN neighbors
+            use_cache: Reuse parsed structures pickled under CACHE_DIR
         """
         self.cutoff_distance = cutoff_distance
-        self.cnn = CrystalNN()
+        self.cutoff_graph = cutoff_graph
+        self.use_cache = use_cache
+        self.cnn = None
+        if not cutoff_graph:
+            from pymatgen.analysis.local_env import CrystalNN
+            self.cnn = CrystalNN()
     
     def load_structure(self, filepath: str) -> Structure:
         """Load crystal structure from various file formats."""
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Structure file not found: {filepath}")
         
-        file_ext = os.path.splitext(filepath)[1].lower()
-        
         try:
-            if file_ext == '.cif':
-                parser = CifParser(filepath)
-                structure = parser.get_structures()[0]  # Take first structure
-            elif filepath.endswith('POSCAR') or filepath.endswith('CONTCAR'):
-                poscar = Poscar.from_file(filepath)
-                structure = poscar.structure
+            if self.use_cache:
+                structure = self._load_cached(filepath)
             else:
-                # Try pymatgen's generic structure reader
-                structure = Structure.from_file(filepath)
+                structure = self._parse(filepath)
             
             print(f"✓ Loaded structure: {structure.formula}")
             print(f"  Space group: {structure.get_space_group_info()[1]}")
@@ -69,7 +110,69 @@ class RBTParityChecker:
         except Exception as e:
             raise ValueError(f"Could not parse structure file {filepath}: {str(e)}")
     
-    def build_connectivity_graph(self, structure: Structure) -> nx.Graph:
+    @staticmethod
+    def _route(filepath: str) -> str:
+        """Pick the parser a file is routed to: 'cif', 'poscar' or 'generic'."""
+        file_ext = os.path.splitext(filepath)[1].lower()
+        if file_ext == '.cif':
+            return 'cif'
+        elif filepath.endswith('POSCAR') or filepath.endswith('CONTCAR'):
+            return 'poscar'
+        return 'generic'
+    
+    def _parse(self, filepath: str) -> Structure:
+        """Parse a structure file with the pymatgen reader for its format."""
+        route = self._route(filepath)
+        if route == 'cif':
+            parser = CifParser(filepath)
+            # Only the first structure is used, so skip the primitive-cell
+            # reduction; occupancy validation stays on so invalid CIFs still fail
+            if hasattr(parser, 'parse_structures'):
+                return parser.parse_structures(primitive=False)[0]
+            else:  # pymatgen < 2024.2
+                return parser.get_structures(primitive=False)[0]
+        elif route == 'poscar':
+            return Poscar.from_file(filepath).structure
+        # Try pymatgen's generic structure reader
+        return Structure.from_file(filepath)
+    
+    def _load_cached(self, filepath: str) -> Structure:
+        """
+        Parse a structure file, reusing a pickled Structure from an earlier run.
+        
+        The cache key covers the file contents, the parser it is routed to and
+        the pymatgen/numpy versions, so an edited file or an upgrade parses
+        again. Any failure to read or unpickle an entry counts as a miss, and a
+        cache directory that cannot be written just falls back to parsing.
+        """
+        route = self._route(filepath)
+        key = f"{route}:{_PYMATGEN_VERSION}:{np.__version__}".encode()
+        with open(filepath, 'rb') as f:
+            digest = hashlib.blake2b(key + b'\0' + f.read()).hexdigest()[:16]
+        cache_file = os.path.join(CACHE_DIR, f"{digest}.pkl")
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                structure = pickle.load(f)
+            if isinstance(structure, Structure):
+                return structure
+        except Exception:
+            pass
+        
+        structure = self._parse(filepath)
+        
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(structure, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+        
+        return structure
+    
+    def build_connectivity_graph(self, structure: Structure) -> Tuple[int, np.ndarray]:
         """
         Build connectivity graph of the crystal structure.
         
@@ -77,66 +180,114 @@ class RBTParityChecker:
             structure: pymatgen Structure object
             
         Returns:
-            NetworkX graph representing atomic connectivity
+            Tuple of (number of atoms, (M, 2) array of bonded atom pairs i <= j);
+            a pair bonded through several periodic images appears once
         """
-        G = nx.Graph()
-        
-        # Add all atoms as nodes
-        for i, site in enumerate(structure):
-            G.add_node(i, 
-                      element=site.species_string,
-                      coords=site.coords,
-                      frac_coords=site.frac_coords)
-        
-        # Add edges based on CrystalNN neighbor finding
+        n_atoms = len(structure)
         print("  Building connectivity graph...")
         
-        for i, site in enumerate(structure):
-            try:
-                # Get neighbors using CrystalNN
-                neighbors = self.cnn.get_nn_info(structure, i)
-                
-                for neighbor in neighbors:
-                    j = neighbor['site_index']
-                    distance = neighbor['weight']  # Distance in Angstroms
+        if self.cutoff_graph:
+            pairs = self._cutoff_pairs(structure)
+        else:
+            # Add edges based on CrystalNN neighbor finding
+            pair_list = []
+            for i, site in enumerate(structure):
+                try:
+                    # Get neighbors using CrystalNN
+                    neighbors = self.cnn.get_nn_info(structure, i)
                     
-                    # Add edge if within cutoff and not already present
-                    if distance <= self.cutoff_distance and not G.has_edge(i, j):
-                        G.add_edge(i, j, distance=distance)
+                    for neighbor in neighbors:
+                        j = neighbor['site_index']
+                        # 'weight' is CrystalNN's bond weight, not a length
+                        distance = np.linalg.norm(neighbor['site'].coords - site.coords)
                         
-            except Exception as e:
-                print(f"    Warning: Could not find neighbors for atom {i}: {e}")
-                continue
+                        # Keep the bond if within cutoff; a bond to the atom's
+                        # own periodic image is a self-loop and counts twice
+                        if distance <= self.cutoff_distance:
+                            pair_list.append((min(i, j), max(i, j)))
+                            
+                except Exception as e:
+                    print(f"    Warning: Could not find neighbors for atom {i}: {e}")
+                    continue
+            pairs = np.array(pair_list, dtype=np.int64).reshape(-1, 2)
+        
+        edges = np.unique(pairs, axis=0)
+        print(f"  Graph built: {n_atoms} nodes, {len(edges)} edges")
+        return n_atoms, edges
+    
+    def _cutoff_pairs(self, structure: Structure) -> np.ndarray:
+        """
+        Return (i, j) index pairs, i <= j, of atoms within the cutoff distance.
+        
+        A single KD-tree over the periodic images replaces CrystalNN's per-site
+        Voronoi analysis. Each bond (i, j, image) is seen from both ends and is
+        kept once; a bond from an atom to its own periodic image stays as the
+        self-loop (i, i), as the CrystalNN route reports it.
+        """
+        from scipy.spatial import cKDTree
         
-        print(f"  Graph built: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-        return G
+        lattice = structure.lattice.matrix
+        cart = np.mod(structure.frac_coords, 1.0) @ lattice
+        n_atoms = len(cart)
+        
+        # Replicate the cell over just enough periodic images to cover the
+        # cutoff sphere: ceil(r / interplanar spacing) along each axis
+        spacings = 1.0 / np.linalg.norm(np.linalg.inv(lattice).T, axis=1)
+        n_images = np.ceil(self.cutoff_distance / spacings).astype(int)
+        shifts = np.stack(np.meshgrid(*[np.arange(-n, n + 1) for n in n_images],
+                                      indexing='ij'), axis=-1).reshape(-1, 3)
+        image_cart = (cart[None, :, :] + (shifts @ lattice)[:, None, :]).reshape(-1, 3)
+        
+        hits = cKDTree(cart).sparse_distance_matrix(
+            cKDTree(image_cart), self.cutoff_distance, output_type='ndarray')
+        i = hits['i'].astype(np.int64)
+        image, j = np.divmod(hits['j'].astype(np.int64), n_atoms)
+        # (i, i, n) and (i, i, -n) are the same bond: keep the image whose
+        # first non-zero shift component is positive
+        shift = shifts[image]
+        lead = np.take_along_axis(shift, np.argmax(shift != 0, axis=1)[:, None], axis=1)[:, 0]
+        keep = (hits['v'] > 1e-8) & ((i < j) | ((i == j) & (lead > 0)))
+        return np.stack([i[keep], j[keep]], axis=1)
     
-    def calculate_parity(self, graph: nx.Graph) -> Tuple[int, List[int], Dict]:
+    def calculate_parity(self, n_atoms: int, edges: np.ndarray) -> Tuple[int, np.ndarray, Dict]:
         """
         Calculate the RBT parity parameter K.
         
         Args:
-            graph: NetworkX graph of atomic connectivity
+            n_atoms: Number of atoms (graph vertices)
+            edges: (M, 2) array of bonded atom pairs from `build_connectivity_graph`
             
         Returns:
-            Tuple of (K value, list of odd-degree vertices, degree statistics)
+            Tuple of (K value, array of odd-degree vertex indices, degree
+            statistics); the statistics include the per-atom int32 `degrees` array
         """
-        degrees = dict(graph.degree())
-        degree_values = list(degrees.values())
+        if n_atoms == 0:
+            degrees = np.zeros(0, dtype=np.int32)
+            K, min_degree, max_degree, avg_degree = 0, 0, 0, 0
+        elif _parity_kernel is not None:
+            degrees, K, min_degree, max_degree, total = _parity_kernel(
+                np.ascontiguousarray(edges, dtype=np.int64), n_atoms)
+            K = int(K)
+            avg_degree = total / n_atoms
+        else:
+            degrees = np.bincount(edges.ravel(), minlength=n_atoms).astype(np.int32)
+            K = int((degrees & 1).sum())
+            min_degree, max_degree = degrees.min(), degrees.max()
+            avg_degree = degrees.mean()
         
-        # Count odd-degree vertices
-        odd_vertices = [node for node, degree in degrees.items() if degree % 2 == 1]
-        K = len(odd_vertices)
+        # Odd-degree vertices
+        odd_vertices = np.flatnonzero(degrees & 1)
         
         # Statistics
         stats = {
-            'total_vertices': graph.number_of_nodes(),
-            'total_edges': graph.number_of_edges(),
-            'min_degree': min(degree_values) if degree_values else 0,
-            'max_degree': max(degree_values) if degree_values else 0,
-            'avg_degree': np.mean(degree_values) if degree_values else 0,
+            'total_vertices': n_atoms,
+            'total_edges': len(edges),
+            'min_degree': int(min_degree),
+            'max_degree': int(max_degree),
+            'avg_degree': float(avg_degree),
             'odd_degree_count': K,
-            'even_degree_count': len(degree_values) - K
+            'even_degree_count': n_atoms - K,
+            'degrees': degrees
         }
         
         return K, odd_vertices, stats
@@ -159,10 +310,10 @@ class RBTParityChecker:
         structure = self.load_structure(filepath)
         
         # Build connectivity graph
-        graph = self.build_connectivity_graph(structure)
+        n_atoms, edges = self.build_connectivity_graph(structure)
         
         # Calculate parity
-        K, odd_vertices, stats = self.calculate_parity(graph)
+        K, odd_vertices, stats = self.calculate_parity(n_atoms, edges)
         
         # Results
         results = {
@@ -172,7 +323,8 @@ class RBTParityChecker:
             'passes_parity_test': K == 0,
             'odd_vertices': odd_vertices,
             'graph_stats': stats,
-            'structure': structure
+            'structure': structure,
+            'edges': edges
         }
         
         return results
@@ -199,17 +351,17 @@ class RBTParityChecker:
         print(f"  Odd-degree atoms: {stats['odd_degree_count']}")
         print(f"  Even-degree atoms: {stats['even_degree_count']}")
         
-        if results['odd_vertices']:
+        if len(results['odd_vertices']):
             print(f"\nODD-DEGREE VERTICES:")
             structure = results['structure']
+            degrees = stats['degrees']
             for vertex in results['odd_vertices'][:10]:  # Show first 10
                 site = structure[vertex]
-                degree = dict(nx.degree(self.build_connectivity_graph(structure)))[vertex]
-                print(f"  Atom {vertex}: {site.species_string} (degree {degree})")
+                print(f"  Atom {vertex}: {site.species_string} (degree {degrees[vertex]})")
             if len(results['odd_vertices']) > 10:
                 print(f"  ... and {len(results['odd_vertices']) - 10} more")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="RBT Parity Checker for 2-D Superconductor Screening",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -218,6 +370,7 @@ Examples:
     python parity_check.py Li2NH.cif
     python parity_check.py POSCAR
     python parity_check.py --cutoff 4.0 structure.cif
+    python parity_check.py --cutoff-graph large_supercell.cif
         """
     )
     
@@ -227,12 +380,17 @@ Examples:
                        help='Bond distance cutoff in Angstroms (default: 3.5)')
     parser.add_argument('--quiet', '-q', action='store_true',
                        help='Suppress detailed output')
+    parser.add_argument('--cutoff-graph', action='store_true',
+                       help='Bond every atom pair within the cutoff instead of CrystalNN neighbors (faster)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Reuse parsed structures from $XDG_CACHE_HOME/rbt (default ~/.cache/rbt)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Initialize checker
-        checker = RBTParityChecker(cutoff_distance=args.cutoff)
+        checker = RBTParityChecker(cutoff_distance=args.cutoff, cutoff_graph=args.cutoff_graph,
+                                   use_cache=args.cache)
         
         # Analyze structure
         results = checker.analyze_structure(args.structure_file)
@@ -247,11 +405,11 @@ Examples:
         if args.quiet:
             print(f"K={results['K_parity']} {'PASS' if results['passes_parity_test'] else 'FAIL'}")
         
-        sys.exit(exit_code)
+        return exit_code
         
     except Exception as e:
         print(f"ERROR: {str(e)}")
-        sys.exit(2)
+        return 2
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
@@ -3,60 +3,220 @@
 Post-process QE strain scan results to extract λ values and predict Tc.
 """
 
+import os
 import re
+import math
+import json
+import mmap
 import pathlib
-import pandas as pd
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import argparse
 import numpy as np
 from datetime import datetime
 
-def extract_lambda_from_ph(ph_file: pathlib.Path) -> dict:
-    """Extract lambda and related values from phonon output."""
-    content = ph_file.read_text()
+# Compiled once at import instead of going through re's pattern cache per call;
+# the phonon-output patterns are bytes so ph.out never needs decoding
+_LAMBDA_RE = re.compile(rb'lambda\s*=\s*([\d.]+)')
+_WLOG_RE = re.compile(rb'omega\(log\)\s*=\s*([\d.]+)\s*K\s*=\s*([\d.]+)\s*cm-1')
+_TC_RE = re.compile(rb'Estimated Allen-Dynes Tc\s*=\s*([\d.]+)\s*K')
+
+# ph.x prints lambda, omega(log) and Tc at the very end of its output
+_TAIL_BYTES = 65536
+
+def _search(content, anchor: bytes, pattern, start: int = 0):
+    """Run a compiled regex from `start` only when its literal anchor occurs there.
+    
+    The substring test is a plain C scan, much cheaper than a failing regex
+    search; `find` is used because mmap's `in` only tests single bytes.
+    """
+    return pattern.search(content, start) if content.find(anchor, start) != -1 else None
+
+def _parse_ph_content(content, start: int = 0) -> dict:
+    """Pull lambda, omega_log and Tc out of ph.out bytes (or a mapping of them).
     
+    Fields that are not found are None.
+    """
     # Extract lambda
-    lambda_match = re.search(r'lambda\s*=\s*([\d.]+)', content)
-    if not lambda_match:
-        raise ValueError(f"Could not find lambda in {ph_file}")
+    lambda_match = _search(content, b'lambda', _LAMBDA_RE, start)
     
     # Extract omega_log
-    wlog_match = re.search(r'omega\(log\)\s*=\s*([\d.]+)\s*K\s*=\s*([\d.]+)\s*cm-1', content)
+    wlog_match = _search(content, b'omega(log)', _WLOG_RE, start)
     
     # Extract Tc
-    tc_match = re.search(r'Estimated Allen-Dynes Tc\s*=\s*([\d.]+)\s*K', content)
+    tc_match = _search(content, b'Allen-Dynes', _TC_RE, start)
     
     return {
-        'lambda': float(lambda_match.group(1)),
+        'lambda': float(lambda_match.group(1)) if lambda_match else None,
         'omega_log_K': float(wlog_match.group(1)) if wlog_match else None,
         'omega_log_cm': float(wlog_match.group(2)) if wlog_match else None,
         'Tc_AD': float(tc_match.group(1)) if tc_match else None
     }
 
+def extract_lambda_from_ph(ph_file: pathlib.Path) -> dict:
+    """Extract lambda and related values from phonon output."""
+    with ph_file.open('rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            data = _parse_ph_content(b'')  # an empty file cannot be mapped
+        else:
+            # Scan the page-cache mapping directly: no read copy and no decode;
+            # the values are converted to floats before the mapping is closed
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Only the tail is searched first, so large outputs cost O(1);
+                # the whole file is rescanned if anything is missing there
+                tail_start = max(0, size - _TAIL_BYTES)
+                data = _parse_ph_content(mm, tail_start)
+                if tail_start > 0 and None in data.values():
+                    data = _parse_ph_content(mm)
+    
+    if data['lambda'] is None:
+        raise ValueError(f"Could not find lambda in {ph_file}")
+    return data
+
 def check_phonon_stability(dyn_file: pathlib.Path) -> tuple[bool, float]:
     """Check if all phonon frequencies are positive."""
-    content = dyn_file.read_text()
-    
-    # Extract all frequencies
-    freq_matches = re.findall(r'freq\(\s*\d+\)\s*=\s*([-\d.]+)\s*\[cm-1\]', content)
-    if not freq_matches:
+    # dyn lines are a fixed "freq(   n) =   value [cm-1]" table, so plain
+    # find/slice on each streamed line replaces the regex scan
+    min_freq = math.inf
+    with dyn_file.open('rb') as f:
+        for line in f:
+            idx = line.find(b'freq(')
+            if idx < 0:
+                continue
+            end = line.find(b'[cm-1]', idx)
+            eq = line.rfind(b'=', idx, end)
+            if end < 0 or eq < 0:
+                continue
+            try:
+                freq = float(line[eq + 1:end])
+            except ValueError:
+                continue
+            if freq < min_freq:
+                min_freq = freq
+    if min_freq == math.inf:
         return True, 0.0  # Assume stable if no frequencies found
     
-    frequencies = [float(f) for f in freq_matches]
-    min_freq = min(frequencies)
-    
     return min_freq >= 0, min_freq
 
-def calculate_tc_mcmillan(lambda_val: float, omega_log: float, mu_star: float = 0.1) -> float:
-    """Calculate Tc using McMillan formula."""
-    if lambda_val <= mu_star:
-        return 0.0
+def calculate_tc_mcmillan(lambda_val, omega_log, mu_star: float = 0.1):
+    """Calculate Tc using McMillan formula.
+    
+    Works element-wise on arrays (one ufunc chain over a whole scan) and
+    returns a float for scalar input; Tc is 0 where λ ≤ μ*.
+    """
+    lam = np.asarray(lambda_val, dtype=float)
+    wlog = np.asarray(omega_log, dtype=float)
+    
+    numerator = wlog / 1.45
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        denominator = (1 + lam) * np.exp(1.04 * (1 + lam) / (lam - mu_star * (1 + 0.62 * lam)))
+        tc = np.where(lam > mu_star, numerator / denominator, 0.0)
+    
+    return tc if tc.ndim else float(tc)
+
+def _process_folder(folder: pathlib.Path) -> tuple:
+    """Parse one strain folder and return (result record or None, status line)."""
+    strain_str = folder.name.replace("strain_", "").replace("pc", "")
+    strain = int(strain_str)
+    
+    # Check for output files
+    ph_file = folder / "ph.out"
+    dyn_file = folder / "dyn0"
+    
+    if not ph_file.exists():
+        return None, f"  ⚠️  Missing ph.out in {folder}"
+    
+    result = None
+    try:
+        # Extract data
+        ph_data = extract_lambda_from_ph(ph_file)
+        
+        # Check stability
+        stable = True
+        min_freq = 0.0
+        if dyn_file.exists():
+            stable, min_freq = check_phonon_stability(dyn_file)
+        
+        # The McMillan Tc is filled in for the whole scan at once in main();
+        # omega_log_K is carried only for that and dropped before saving
+        result = {
+            'strain_%': strain,
+            'lambda': ph_data['lambda'],
+            'omega_log_cm-1': ph_data['omega_log_cm'],
+            'Tc_AD_K': ph_data['Tc_AD'],
+            'Tc_McMillan_K': None,
+            'stable': stable,
+            'min_freq_cm-1': min_freq,
+            'omega_log_K': ph_data['omega_log_K']
+        }
+        
+        status = "✓ STABLE" if stable else "⚠️  UNSTABLE"
+        return result, f"  {status} Strain {strain:+3d}%: λ = {ph_data['lambda']:.3f}, Tc = {ph_data['Tc_AD']:.1f} K"
+        
+    except Exception as e:
+        # Only the status line can fail after the record is built; keep the record
+        return result, f"  ❌ Error processing {folder}: {e}"
+
+# Record fields gathered column-wise in main(); omega_log_K only feeds McMillan
+_RESULT_COLUMNS = ('strain_%', 'lambda', 'omega_log_cm-1', 'Tc_AD_K', 'stable',
+                   'min_freq_cm-1', 'omega_log_K')
+
+# Parsed folders from earlier runs: folder name -> output-file signatures,
+# result record and status line
+CACHE_FILE = ".strain_scan_cache.json"
+# Bump whenever the layout of a result record changes, so stale entries are dropped
+CACHE_VERSION = 2
+
+def _file_signature(path: pathlib.Path):
+    """Return [mtime_ns, size] for a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def _load_cache() -> dict:
+    """Read the parse cache; a missing or corrupt cache is just empty."""
+    try:
+        with open(CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('folders', {})
+
+def _save_cache(cache: dict):
+    """Write the parse cache atomically; failing to write it is not an error."""
+    tmp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump({'version': CACHE_VERSION, 'folders': cache}, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError:
+        pass
+
+def _process_folder_cached(folder: pathlib.Path, cache: dict) -> tuple:
+    """`_process_folder`, reusing the cached outcome while ph.out and dyn0 are unchanged.
     
-    numerator = omega_log / 1.45
-    denominator = (1 + lambda_val) * np.exp(1.04 * (1 + lambda_val) / (lambda_val - mu_star * (1 + 0.62 * lambda_val)))
+    Returns (result record or None, status line, cache entry).
+    """
+    signature = [_file_signature(folder / "ph.out"), _file_signature(folder / "dyn0")]
+    entry = cache.get(folder.name)
+    if entry is not None and entry.get('signature') == signature:
+        return entry['result'], entry['message'], entry
     
-    return numerator / denominator
+    result, message = _process_folder(folder)
+    return result, message, {'signature': signature, 'result': result, 'message': message}
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Post-process QE strain scan results to extract λ values and predict Tc")
+    parser.add_argument('--no-plot', dest='plot', action='store_false',
+                       help='Only write the CSV and summary; skip the analysis figure')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("POST-PROCESSING STRAIN SCAN RESULTS")
     print("=" * 60)
@@ -67,62 +227,45 @@ def main():
         print("ERROR: No strain folders found!")
         return
     
-    results = []
+    # Folders are independent and mostly I/O; parse them on a thread pool and
+    # print from this thread, in folder order; unchanged folders come from the cache
+    cache = _load_cache()
+    new_cache = {}
+    results = {key: [] for key in _RESULT_COLUMNS}
+    with ThreadPoolExecutor(max_workers=min(32, len(strain_folders))) as ex:
+        worker = partial(_process_folder_cached, cache=cache)
+        for folder, (result, message, entry) in zip(strain_folders, ex.map(worker, strain_folders)):
+            new_cache[folder.name] = entry
+            if result is not None:
+                for key, column in results.items():
+                    column.append(result[key])
+            print(message)
+    _save_cache(new_cache)
     
-    for folder in strain_folders:
-        strain_str = folder.name.replace("strain_", "").replace("pc", "")
-        strain = int(strain_str)
-        
-        # Check for output files
-        ph_file = folder / "ph.out"
-        dyn_file = folder / "dyn0"
-        
-        if not ph_file.exists():
-            print(f"  ⚠️  Missing ph.out in {folder}")
-            continue
-        
-        try:
-            # Extract data
-            ph_data = extract_lambda_from_ph(ph_file)
-            
-            # Check stability
-            stable = True
-            min_freq = 0.0
-            if dyn_file.exists():
-                stable, min_freq = check_phonon_stability(dyn_file)
-            
-            # Calculate additional Tc estimates
-            tc_mcmillan = None
-            if ph_data['omega_log_K']:
-                tc_mcmillan = calculate_tc_mcmillan(
-                    ph_data['lambda'], 
-                    ph_data['omega_log_K']
-                )
-            
-            result = {
-                'strain_%': strain,
-                'lambda': ph_data['lambda'],
-                'omega_log_cm-1': ph_data['omega_log_cm'],
-                'Tc_AD_K': ph_data['Tc_AD'],
-                'Tc_McMillan_K': tc_mcmillan,
-                'stable': stable,
-                'min_freq_cm-1': min_freq
-            }
-            
-            results.append(result)
-            
-            status = "✓ STABLE" if stable else "⚠️  UNSTABLE"
-            print(f"  {status} Strain {strain:+3d}%: λ = {ph_data['lambda']:.3f}, Tc = {ph_data['Tc_AD']:.1f} K")
-            
-        except Exception as e:
-            print(f"  ❌ Error processing {folder}: {e}")
-    
-    if not results:
+    if not results['strain_%']:
         print("ERROR: No valid results found!")
         return
     
-    # Create DataFrame
-    df = pd.DataFrame(results)
+    # pandas and matplotlib cost more to import than the whole parse above;
+    # load them only once there is something to tabulate
+    import pandas as pd
+    
+    # Additional Tc estimate, vectorized over all strains; rows without
+    # omega_log have no McMillan value
+    lam = np.asarray(results['lambda'], dtype=float)
+    wlog = np.asarray(results['omega_log_K'], dtype=float)
+    tc_mcmillan = calculate_tc_mcmillan(lam, wlog)
+    
+    # Create DataFrame straight from typed column arrays (None -> NaN)
+    df = pd.DataFrame({
+        'strain_%': np.asarray(results['strain_%'], dtype=int),
+        'lambda': lam,
+        'omega_log_cm-1': np.asarray(results['omega_log_cm-1'], dtype=float),
+        'Tc_AD_K': np.asarray(results['Tc_AD_K'], dtype=float),
+        'Tc_McMillan_K': np.where(np.isnan(wlog) | (wlog == 0), np.nan, tc_mcmillan),
+        'stable': np.asarray(results['stable'], dtype=bool),
+        'min_freq_cm-1': np.asarray(results['min_freq_cm-1'], dtype=float),
+    })
     df = df.sort_values('strain_%')
     
     # Save CSV
@@ -130,61 +273,66 @@ def main():
     df.to_csv(csv_file, index=False)
     print(f"\n📊 Results saved to {csv_file}")
     
-    # Create plots
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
-    
-    # 1. Lambda vs strain
-    stable_mask = df['stable']
-    ax1.plot(df['strain_%'], df['lambda'], 'o-', color='blue', markersize=8)
-    ax1.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'lambda'], 
-                color='red', s=100, marker='x', label='Unstable')
-    ax1.set_xlabel('Strain (%)')
-    ax1.set_ylabel('Electron-phonon coupling λ')
-    ax1.set_title('Electron-Phonon Coupling vs Strain')
-    ax1.grid(True, alpha=0.3)
-    ax1.axhline(y=0.84, color='gray', linestyle='--', alpha=0.5, label='Reference')
-    if (~stable_mask).any():
-        ax1.legend()
-    
-    # 2. Tc vs strain
-    ax2.plot(df['strain_%'], df['Tc_AD_K'], 'o-', color='green', markersize=8, label='Allen-Dynes')
-    if df['Tc_McMillan_K'].notna().any():
-        ax2.plot(df['strain_%'], df['Tc_McMillan_K'], 's-', color='orange', markersize=6, label='McMillan')
-    ax2.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'Tc_AD_K'], 
-                color='red', s=100, marker='x')
-    ax2.set_xlabel('Strain (%)')
-    ax2.set_ylabel('Critical Temperature (K)')
-    ax2.set_title('Predicted Tc vs Strain')
-    ax2.grid(True, alpha=0.3)
-    ax2.axhline(y=300, color='red', linestyle='--', alpha=0.5, label='Room temp')
-    ax2.legend()
-    
-    # 3. Omega_log vs strain
-    ax3.plot(df['strain_%'], df['omega_log_cm-1'], 'o-', color='purple', markersize=8)
-    ax3.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'omega_log_cm-1'], 
-                color='red', s=100, marker='x')
-    ax3.set_xlabel('Strain (%)')
-    ax3.set_ylabel('ω_log (cm⁻¹)')
-    ax3.set_title('Logarithmic Average Phonon Frequency vs Strain')
-    ax3.grid(True, alpha=0.3)
-    
-    # 4. Tc vs lambda
-    ax4.scatter(df['lambda'], df['Tc_AD_K'], c=df['strain_%'], s=100, cmap='coolwarm', edgecolor='black')
-    cbar = plt.colorbar(ax4.collections[0], ax=ax4, label='Strain (%)')
-    ax4.set_xlabel('λ')
-    ax4.set_ylabel('Tc (K)')
-    ax4.set_title('Tc vs λ (colored by strain)')
-    ax4.grid(True, alpha=0.3)
-    ax4.axhline(y=300, color='red', linestyle='--', alpha=0.5)
-    
-    # Overall figure adjustments
-    fig.suptitle(f'Li₂NH Strain Scan Analysis - {datetime.now().strftime("%Y-%m-%d")}', fontsize=14)
-    plt.tight_layout()
-    
-    # Save plot
-    plot_file = "strain_scan_analysis.png"
-    plt.savefig(plot_file, dpi=150, bbox_inches='tight')
-    print(f"📈 Plots saved to {plot_file}")
+    if args.plot:
+        import matplotlib
+        matplotlib.use('Agg')  # files only; skip interactive backend detection
+        import matplotlib.pyplot as plt
+        
+        # Create plots
+        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
+        
+        # 1. Lambda vs strain
+        stable_mask = df['stable']
+        ax1.plot(df['strain_%'], df['lambda'], 'o-', color='blue', markersize=8)
+        ax1.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'lambda'], 
+                    color='red', s=100, marker='x', label='Unstable')
+        ax1.set_xlabel('Strain (%)')
+        ax1.set_ylabel('Electron-phonon coupling λ')
+        ax1.set_title('Electron-Phonon Coupling vs Strain')
+        ax1.grid(True, alpha=0.3)
+        ax1.axhline(y=0.84, color='gray', linestyle='--', alpha=0.5, label='Reference')
+        if (~stable_mask).any():
+            ax1.legend()
+        
+        # 2. Tc vs strain
+        ax2.plot(df['strain_%'], df['Tc_AD_K'], 'o-', color='green', markersize=8, label='Allen-Dynes')
+        if df['Tc_McMillan_K'].notna().any():
+            ax2.plot(df['strain_%'], df['Tc_McMillan_K'], 's-', color='orange', markersize=6, label='McMillan')
+        ax2.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'Tc_AD_K'], 
+                    color='red', s=100, marker='x')
+        ax2.set_xlabel('Strain (%)')
+        ax2.set_ylabel('Critical Temperature (K)')
+        ax2.set_title('Predicted Tc vs Strain')
+        ax2.grid(True, alpha=0.3)
+        ax2.axhline(y=300, color='red', linestyle='--', alpha=0.5, label='Room temp')
+        ax2.legend()
+        
+        # 3. Omega_log vs strain
+        ax3.plot(df['strain_%'], df['omega_log_cm-1'], 'o-', color='purple', markersize=8)
+        ax3.scatter(df.loc[~stable_mask, 'strain_%'], df.loc[~stable_mask, 'omega_log_cm-1'], 
+                    color='red', s=100, marker='x')
+        ax3.set_xlabel('Strain (%)')
+        ax3.set_ylabel('ω_log (cm⁻¹)')
+        ax3.set_title('Logarithmic Average Phonon Frequency vs Strain')
+        ax3.grid(True, alpha=0.3)
+        
+        # 4. Tc vs lambda
+        ax4.scatter(df['lambda'], df['Tc_AD_K'], c=df['strain_%'], s=100, cmap='coolwarm', edgecolor='black')
+        cbar = plt.colorbar(ax4.collections[0], ax=ax4, label='Strain (%)')
+        ax4.set_xlabel('λ')
+        ax4.set_ylabel('Tc (K)')
+        ax4.set_title('Tc vs λ (colored by strain)')
+        ax4.grid(True, alpha=0.3)
+        ax4.axhline(y=300, color='red', linestyle='--', alpha=0.5)
+        
+        # Overall figure adjustments
+        fig.suptitle(f'Li₂NH Strain Scan Analysis - {datetime.now().strftime("%Y-%m-%d")}', fontsize=14)
+        plt.tight_layout()
+        
+        # Save plot
+        plot_file = "strain_scan_analysis.png"
+        plt.savefig(plot_file, dpi=150, bbox_inches='tight')
+        print(f"📈 Plots saved to {plot_file}")
     
     # Print summary
     print("\n" + "=" * 60)
@@ -10,39 +10,79 @@ Usage:
     python qe_builder.py POSCAR --phonons --prefix Li2NH
 """
 
+from __future__ import annotations
+
+import functools
+import io
 import sys
 import os
 import numpy as np
-from pymatgen.core import Structure
-from pymatgen.io.cif import CifParser
-from pymatgen.io.vasp import Poscar
-from pymatgen.io.pwscf import PWInput
 import argparse
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 import warnings
 warnings.filterwarnings('ignore')
 
+# pymatgen is imported where it is first needed, so --help and argument
+# errors return without paying for it
+if TYPE_CHECKING:
+    from pymatgen.core import Structure
+
+# Pseudopotential mapping (using standard PAW/USPP)
+PSEUDOPOTENTIALS = {
+    'H': 'H.pbe-rrkjus_psl.1.0.0.UPF',
+    'Li': 'Li.pbe-s-rrkjus_psl.1.0.0.UPF',
+    'Be': 'Be.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'B': 'B.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'C': 'C.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'N': 'N.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'O': 'O.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'F': 'F.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'Al': 'Al.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'Si': 'Si.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'P': 'P.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'S': 'S.pbe-n-rrkjus_psl.1.0.0.UPF',
+    'Cl': 'Cl.pbe-n-rrkjus_psl.1.0.0.UPF',
+}
+
+@functools.lru_cache(maxsize=None)
+def _pseudos_for(elements: tuple) -> Dict[str, str]:
+    """Pseudopotential file per element, in the order given (cached per species set)."""
+    return {el: PSEUDOPOTENTIALS.get(el, f"{el}.pbe-n-kjpaw_psl.1.0.0.UPF")
+            for el in elements}
+
+def _write_namelist(f, name: str, params: Dict, trailer: str = "/\n\n"):
+    """Write one Fortran namelist block (&NAME ... /) to a text stream."""
+    f.write(f"&{name}\n")
+    for key, value in params.items():
+        # bool before str/number: True is an int and must become .true.
+        if isinstance(value, bool):
+            f.write(f"  {key} = .{str(value).lower()}.\n")
+        elif isinstance(value, str):
+            f.write(f"  {key} = '{value}'\n")
+        else:
+            f.write(f"  {key} = {value}\n")
+    f.write(trailer)
+
+def _atomic_write(output_file: str, text: str):
+    """Write text via a temporary sibling file so readers never see a partial input."""
+    # Per-process name, so concurrent builders writing the same file don't
+    # share (and truncate) one temporary
+    tmp = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, output_file)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
 class QEInputBuilder:
     """
     Builds Quantum Espresso input files for 2-D materials phonon calculations.
     """
     
-    # Pseudopotential mapping (using standard PAW/USPP)
-    PSEUDOPOTENTIALS = {
-        'H': 'H.pbe-rrkjus_psl.1.0.0.UPF',
-        'Li': 'Li.pbe-s-rrkjus_psl.1.0.0.UPF',
-        'Be': 'Be.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'B': 'B.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'C': 'C.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'N': 'N.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'O': 'O.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'F': 'F.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'Al': 'Al.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'Si': 'Si.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'P': 'P.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'S': 'S.pbe-n-rrkjus_psl.1.0.0.UPF',
-        'Cl': 'Cl.pbe-n-rrkjus_psl.1.0.0.UPF',
-    }
+    PSEUDOPOTENTIALS = PSEUDOPOTENTIALS
     
     def __init__(self):
         """Initialize the QE input builder."""
@@ -53,17 +93,12 @@ class QEInputBuilder:
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Structure file not found: {filepath}")
         
-        file_ext = os.path.splitext(filepath)[1].lower()
+        from pymatgen.core import Structure
         
         try:
-            if file_ext == '.cif':
-                parser = CifParser(filepath)
-                structure = parser.get_structures()[0]
-            elif filepath.endswith('POSCAR') or filepath.endswith('CONTCAR'):
-                poscar = Poscar.from_file(filepath)
-                structure = poscar.structure
-            else:
-                structure = Structure.from_file(filepath)
+            # Structure.from_file dispatches on CIF/POSCAR/CONTCAR/... itself and
+            # parses only the first CIF block, in the cell as written
+            structure = Structure.from_file(filepath)
             
             print(f"✓ Loaded structure: {structure.formula}")
             return structure
@@ -83,15 +118,8 @@ class QEInputBuilder:
             Dictionary with QE input parameters
         """
         # Get unique elements and set up pseudopotentials
-        elements = [str(el) for el in structure.composition.elements]
-        pseudopotentials = {}
-        
-        for element in elements:
-            if element in self.PSEUDOPOTENTIALS:
-                pseudopotentials[element] = self.PSEUDOPOTENTIALS[element]
-            else:
-                # Generic pseudopotential name
-                pseudopotentials[element] = f"{element}.pbe-n-kjpaw_psl.1.0.0.UPF"
+        elements = tuple(str(el) for el in structure.composition.elements)
+        pseudopotentials = dict(_pseudos_for(elements))
         
         # Determine if 2-D system (look for large vacuum layer)
         lattice = structure.lattice
@@ -177,76 +205,46 @@ class QEInputBuilder:
     def write_scf_input(self, params: Dict, output_file: str):
         """Write SCF input file in QE format."""
         
-        with open(output_file, 'w') as f:
-            # Control section
-            f.write("&CONTROL\n")
-            for key, value in params['control'].items():
-                if isinstance(value, str):
-                    f.write(f"  {key} = '{value}'\n")
-                else:
-                    f.write(f"  {key} = {value}\n")
-            f.write("/\n\n")
-            
-            # System section
-            f.write("&SYSTEM\n")
-            for key, value in params['system'].items():
-                if isinstance(value, str):
-                    f.write(f"  {key} = '{value}'\n")
-                else:
-                    f.write(f"  {key} = {value}\n")
-            f.write("/\n\n")
-            
-            # Electrons section
-            f.write("&ELECTRONS\n")
-            for key, value in params['electrons'].items():
-                if isinstance(value, str):
-                    f.write(f"  {key} = '{value}'\n")
-                else:
-                    f.write(f"  {key} = {value}\n")
-            f.write("/\n\n")
-            
-            # Atomic species
-            f.write("ATOMIC_SPECIES\n")
-            structure = params['structure']
-            for element in params['pseudopotentials']:
-                mass = structure.composition[element].atomic_mass
-                pseudo = params['pseudopotentials'][element]
-                f.write(f"  {element}  {mass:.6f}  {pseudo}\n")
-            f.write("\n")
-            
-            # Cell parameters
-            f.write("CELL_PARAMETERS (angstrom)\n")
-            lattice = structure.lattice.matrix
-            for row in lattice:
-                f.write(f"  {row[0]:12.8f}  {row[1]:12.8f}  {row[2]:12.8f}\n")
-            f.write("\n")
-            
-            # Atomic positions
-            f.write("ATOMIC_POSITIONS (crystal)\n")
-            for site in structure:
-                element = site.species_string
-                coords = site.frac_coords
-                f.write(f"  {element}  {coords[0]:12.8f}  {coords[1]:12.8f}  {coords[2]:12.8f}\n")
-            f.write("\n")
-            
-            # K-points
-            kpts = params['kpts']
-            f.write("K_POINTS (automatic)\n")
-            f.write(f"  {kpts[0]} {kpts[1]} {kpts[2]}  0 0 0\n")
+        from pymatgen.core import Element
+        
+        buf = io.StringIO()
+        _write_namelist(buf, 'CONTROL', params['control'])
+        _write_namelist(buf, 'SYSTEM', params['system'])
+        _write_namelist(buf, 'ELECTRONS', params['electrons'])
+        
+        # Atomic species
+        buf.write("ATOMIC_SPECIES\n")
+        structure = params['structure']
+        for element in params['pseudopotentials']:
+            mass = Element(element).atomic_mass
+            pseudo = params['pseudopotentials'][element]
+            buf.write(f"  {element}  {mass:.6f}  {pseudo}\n")
+        buf.write("\n")
+        
+        # Cell parameters
+        buf.write("CELL_PARAMETERS (angstrom)\n")
+        np.savetxt(buf, structure.lattice.matrix, fmt='  %12.8f  %12.8f  %12.8f')
+        buf.write("\n")
+        
+        # Atomic positions
+        buf.write("ATOMIC_POSITIONS (crystal)\n")
+        species = [site.species_string for site in structure]
+        for element, (x, y, z) in zip(species, structure.frac_coords):
+            buf.write(f"  {element}  {x:12.8f}  {y:12.8f}  {z:12.8f}\n")
+        buf.write("\n")
+        
+        # K-points
+        kpts = params['kpts']
+        buf.write("K_POINTS (automatic)\n")
+        buf.write(f"  {kpts[0]} {kpts[1]} {kpts[2]}  0 0 0\n")
+        _atomic_write(output_file, buf.getvalue())
     
     def write_phonon_input(self, params: Dict, output_file: str):
         """Write phonon input file in QE format."""
         
-        with open(output_file, 'w') as f:
-            f.write("&INPUTPH\n")
-            for key, value in params['inputph'].items():
-                if isinstance(value, str):
-                    f.write(f"  {key} = '{value}'\n")
-                elif isinstance(value, bool):
-                    f.write(f"  {key} = .{str(value).lower()}.\n")
-                else:
-                    f.write(f"  {key} = {value}\n")
-            f.write("/\n")
+        buf = io.StringIO()
+        _write_namelist(buf, 'INPUTPH', params['inputph'], trailer="/\n")
+        _atomic_write(output_file, buf.getvalue())
     
     def generate_run_script(self, prefix: str, output_file: str = "run_qe.sh"):
         """Generate a bash script to run the QE calculations."""
@@ -5,27 +5,50 @@ Not fully automated yet – serves as scaffolding for SIM-1 task.
 """
 import argparse
 import pathlib
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+import numpy as np
+
 TEMPLATE = pathlib.Path(__file__).resolve().parent.parent / "reference" / "scf.in"
 
 HEADER = "Generated by run_strain_scan.py – edit as needed\n"
 
+def load_template() -> str:
+    """Read the reference scf.in once and turn its in-plane cell fields into
+    format placeholders: the a-vector length and the second lattice row."""
+    text = TEMPLATE.read_text().replace("{", "{{").replace("}", "}}")
+    text = text.replace("3.520", "{a:.6f}", 1)
+    text = text.replace("-1.760  3.050", "{neg_half_a:.3f}  {by:.3f}", 1)
+    return HEADER + text
+
+def _emit(eps: int, a: float, neg_half_a: float, by: float, template: str) -> str:
+    """Write scf.in and ph.in for one strain point and return its status line."""
+    folder = pathlib.Path(f"strain_{eps:+d}pc")
+    folder.mkdir(exist_ok=True)
+    text = template.format(a=a, neg_half_a=neg_half_a, by=by)
+    (folder / "scf.in").write_text(text)
+    # minimal ph input
+    (folder / "ph.in").write_text("&INPUTPH\n  prefix='Li2NH_ci'\n/\n")
+    return f"✓ wrote {folder}/scf.in"
+
 def write_inputs(a0: float, b0: float, c: float, eps_list: List[int]):
-    for eps in eps_list:
-        strain = eps / 100.0
-        a = a0 * (1 + strain)
-        b = b0 * (1 + strain)
-        folder = pathlib.Path(f"strain_{eps:+d}pc")
-        folder.mkdir(exist_ok=True)
-        text = TEMPLATE.read_text()
-        text = text.replace("3.520", f"{a:.6f}", 1)
-        text = text.replace("-1.760  3.050", f"{-a/2:.3f}  {b*0.8660:.3f}", 1)
-        (folder / "scf.in").write_text(HEADER + text)
-        # minimal ph input
-        (folder / "ph.in").write_text("&INPUTPH\n  prefix='Li2NH_ci'\n/\n")
-        print(f"✓ wrote {folder}/scf.in")
+    template = load_template()
+    
+    # All cell parameters up front, so the loop body is only file I/O
+    strains = np.asarray(eps_list, dtype=np.float64) / 100.0
+    a_arr = a0 * (1 + strains)
+    b_arr = b0 * (1 + strains)
+    neg_half_a = -a_arr / 2
+    by_arr = b_arr * 0.8660
+    
+    # Folders are independent, so overlap their mkdir/write syscalls; the
+    # status lines are printed afterwards in strain order
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        lines = list(ex.map(_emit, eps_list, a_arr.tolist(), neg_half_a.tolist(),
+                            by_arr.tolist(), [template] * len(eps_list)))
+    for line in lines:
+        print(line)
 
 def main():
     p = argparse.ArgumentParser()
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from scripts import bond_quantum as bq
+from scripts.bond_quantum import BondQuantumAnalyzer
+
+ROOT = Path(__file__).resolve().parents[1]
+CIF = ROOT / "data" / "example_CIFs" / "Li2NH.cif"
+
+
+@pytest.mark.parametrize("threshold", [1e-15, 0.081])
+def test_early_exit_agrees_with_full_analysis(threshold, capsys):
+    """early_exit decides pass/fail like the full pass and its result prints."""
+    analyzer = BondQuantumAnalyzer()
+    analyzer.threshold_energy = threshold
+    full = analyzer.analyze_structure(str(CIF))
+    quick = analyzer.analyze_structure(str(CIF), early_exit=True)
+
+    assert quick['passes_energy_test'] == full['passes_energy_test']
+    assert full['truncated'] is False
+    if quick['truncated']:
+        assert 'phonon_energy_meV' not in quick
+        assert quick['deciding_bond']['phonon_energy_eV'] >= threshold
+    analyzer.print_results(quick)
+    assert "RESULTS" in capsys.readouterr().out
+
+
+def test_crystalnn_route_reports_bond_lengths():
+    """--use-cnn bonds carry real distances, matching the cutoff search."""
+    cutoff = BondQuantumAnalyzer().analyze_structure(str(CIF))
+    cnn = BondQuantumAnalyzer(use_cnn=True).analyze_structure(str(CIF))
+    assert cnn['shortest_bond']['distance'] == pytest.approx(
+        cutoff['shortest_bond']['distance'])
+
+
+@pytest.mark.parametrize("path", [CIF, ROOT / "structures" / "MgB2H4_optimized.cif"])
+def test_cutoff_neighbors_match_pymatgen(path):
+    """The KD-tree light-atom shells equal pymatgen's get_all_neighbors."""
+    analyzer = BondQuantumAnalyzer()
+    structure = analyzer.load_structure(str(path))
+    fast = sorted((i, j, round(d, 6)) for i, j, d in analyzer._light_atom_neighbors(structure))
+
+    pmg = structure.to_pymatgen()
+    reference = sorted(
+        (i, nb.index, round(nb.nn_distance, 6))
+        for i, shell in enumerate(pmg.get_all_neighbors(analyzer.cutoff_distance))
+        if structure.species[i] in analyzer.LIGHT_ATOMS
+        for nb in shell if nb.nn_distance > 1e-8)
+    assert fast == reference
+
+
+@pytest.mark.skipif(bq._phonon_energy_kernel is None, reason="numba not installed")
+def test_numba_energy_kernel_matches_numpy(monkeypatch):
+    """The compiled energy kernel agrees with the NumPy fallback."""
+    rng = np.random.default_rng(0)
+    d = rng.uniform(0.7, 3.5, 1000)
+    mu = rng.uniform(0.5, 10.0, 1000)
+    fast = BondQuantumAnalyzer().estimate_phonon_energies(d, mu)
+    monkeypatch.setattr(bq, "_phonon_energy_kernel", None)
+    np.testing.assert_allclose(fast, BondQuantumAnalyzer().estimate_phonon_energies(d, mu),
+                               rtol=1e-12)
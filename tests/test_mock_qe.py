@@ -0,0 +1,17 @@
+from scripts.mock_qe_calculations import main as mock_main
+
+
+def test_mock_outputs_for_signed_folders(tmp_path, monkeypatch, capsys):
+    """Every strain folder, with or without an explicit sign, gets outputs."""
+    names = ["strain_-2pc", "strain_-1pc", "strain_+0pc", "strain_+1pc", "strain_2pc"]
+    for name in names:
+        (tmp_path / name).mkdir()
+    (tmp_path / "strain_xpc").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    mock_main()
+
+    for name in names:
+        for out in ("scf.out", "ph.out", "dyn0"):
+            assert (tmp_path / name / out).is_file(), f"{name}/{out} missing"
+    assert "Skipping strain_xpc" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pymatgen.core import Lattice, Structure
+
+from scripts import parity_check as pc
+
+ROOT = Path(__file__).resolve().parents[1]
+CIF = ROOT / "data" / "example_CIFs" / "Li2NH.cif"
+
+
+def test_structure_cache_is_opt_in(tmp_path, monkeypatch):
+    """Nothing is written unless use_cache is set."""
+    monkeypatch.setattr(pc, "CACHE_DIR", str(tmp_path))
+    pc.RBTParityChecker().load_structure(str(CIF))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_structure_cache_roundtrip(tmp_path, monkeypatch):
+    """A cached structure equals a fresh parse; a corrupt entry is a miss."""
+    monkeypatch.setattr(pc, "CACHE_DIR", str(tmp_path))
+    checker = pc.RBTParityChecker(use_cache=True)
+    fresh = checker._parse(str(CIF))
+
+    assert checker.load_structure(str(CIF)) == fresh
+    (entry,) = tmp_path.glob("*.pkl")
+    assert checker.load_structure(str(CIF)) == fresh
+
+    entry.write_bytes(b"not a pickle")
+    assert checker.load_structure(str(CIF)) == fresh
+
+
+@pytest.mark.parametrize("species, coords, a, cutoff", [
+    (["Li"], [[0, 0, 0]], 3.0, 3.2),                       # bonded only to own images
+    (["Li", "H"], [[0, 0, 0], [0.5, 0, 0]], 3.0, 2.0),     # two-atom chain
+    (["Li", "H"], [[0, 0, 0], [0.5, 0, 0]], 3.0, 1.0),     # bonds longer than the cutoff
+])
+def test_cutoff_route_matches_crystalnn(species, coords, a, cutoff):
+    """The KD-tree route gives CrystalNN's edges, self-image loops included."""
+    structure = Structure(Lattice.orthorhombic(a, 10, 10), species, coords)
+    cut = pc.RBTParityChecker(cutoff_distance=cutoff, cutoff_graph=True)
+    cnn = pc.RBTParityChecker(cutoff_distance=cutoff)
+    n_cut, e_cut = cut.build_connectivity_graph(structure)
+    n_cnn, e_cnn = cnn.build_connectivity_graph(structure)
+    np.testing.assert_array_equal(e_cut, e_cnn)
+    assert cut.calculate_parity(n_cut, e_cut)[0] == cnn.calculate_parity(n_cnn, e_cnn)[0]
+
+
+@pytest.mark.parametrize("path", [CIF, ROOT / "structures" / "MgB2H4_optimized.cif"])
+def test_cutoff_pairs_match_pymatgen(path):
+    """The KD-tree bonded pairs equal those from pymatgen's get_all_neighbors."""
+    checker = pc.RBTParityChecker()
+    structure = checker._parse(str(path))
+    fast = {tuple(p) for p in checker._cutoff_pairs(structure).tolist()}
+    reference = {
+        (min(i, nb.index), max(i, nb.index))
+        for i, shell in enumerate(structure.get_all_neighbors(checker.cutoff_distance))
+        for nb in shell if nb.nn_distance > 1e-8}
+    assert fast == reference
+
+
+@pytest.mark.skipif(pc._parity_kernel is None, reason="numba not installed")
+def test_numba_parity_kernel_matches_numpy(monkeypatch):
+    """The compiled degree kernel gives the NumPy fallback's K and statistics."""
+    rng = np.random.default_rng(0)
+    edges = np.sort(rng.integers(0, 50, size=(300, 2)), axis=1)
+    checker = pc.RBTParityChecker()
+    K, odd, stats = checker.calculate_parity(50, edges)
+    monkeypatch.setattr(pc, "_parity_kernel", None)
+    K_ref, odd_ref, stats_ref = checker.calculate_parity(50, edges)
+    assert K == K_ref
+    np.testing.assert_array_equal(odd, odd_ref)
+    np.testing.assert_array_equal(stats['degrees'], stats_ref['degrees'])
+    for key in stats_ref:
+        if key != 'degrees':
+            assert stats[key] == pytest.approx(stats_ref[key]), key
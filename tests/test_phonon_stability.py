@@ -1,15 +1,33 @@
 from pathlib import Path
-from subprocess import CalledProcessError, run, PIPE
-import sys
+
+import numpy as np
+
+from scripts import check_phonon_stability as cps
+from scripts.check_phonon_stability import main as phonon_main
 
 ROOT = Path(__file__).resolve().parents[1]
-SCRIPT = ROOT / "scripts" / "check_phonon_stability.py"
 MOCK = ROOT / "tests" / "data" / "mock.dyn"
 
 
-def test_imaginary_modes():
+def test_imaginary_modes(capsys):
     """check_phonon_stability should exit 1 on imaginary modes."""
-    result = run([sys.executable, str(SCRIPT), str(MOCK)], stdout=PIPE, stderr=PIPE)
+    rc = phonon_main([str(MOCK)])
     # Expect exit code 1 and warning icon
-    assert result.returncode == 1
-    assert b"imaginary" in result.stdout.lower()  # sanity check 
\ No newline at end of file
+    assert rc == 1
+    assert "imaginary" in capsys.readouterr().out.lower()  # sanity check
+
+
+def test_multiple_fields_per_line(tmp_path):
+    """A negative mode sharing a line with a positive one is still found."""
+    dyn = tmp_path / "multi.dyn"
+    dyn.write_bytes(b"freq(1)=  5.5 [cm-1] freq(2)= -7.25 [cm-1]\n")
+    np.testing.assert_array_equal(cps.parse_frequencies(dyn), [5.5, -7.25])
+    assert phonon_main([str(dyn)]) == 1
+
+
+def test_phx_line_reports_cm1(tmp_path):
+    """ph.x prints THz first; the cm^-1 field is the one reported."""
+    ph = tmp_path / "ph.out"
+    ph.write_bytes(b"     freq (    1) =      2.000000 [THz] =    66.71 [cm-1]\n"
+                   b"     freq (    2) =     -0.500000 [THz] =   -16.68 [cm-1]\n")
+    np.testing.assert_array_equal(cps.parse_frequencies(ph), [66.71, -16.68])
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from scripts import process_strain_scan as pss
+
+PH_TAIL = (b"     lambda( 1)=  0.8400   gamma=    0.12 GHz\n"
+           b"     lambda =  0.8400\n"
+           b"     omega(log) =  359.70 K =   250.00 cm-1\n"
+           b"     Estimated Allen-Dynes Tc =   175.0 K\n")
+
+
+def _reference(data: bytes) -> dict:
+    """Whole-file regex search, the behaviour the mmap tail scan must keep."""
+    lam = pss._LAMBDA_RE.search(data)
+    wlog = pss._WLOG_RE.search(data)
+    tc = pss._TC_RE.search(data)
+    return {
+        'lambda': float(lam.group(1)),
+        'omega_log_K': float(wlog.group(1)),
+        'omega_log_cm': float(wlog.group(2)),
+        'Tc_AD': float(tc.group(1)),
+    }
+
+
+@pytest.mark.parametrize("padding_after", [0, 2 * pss._TAIL_BYTES])
+def test_extract_lambda_tail_and_fallback(tmp_path, padding_after):
+    """Values at the end come from the tail scan; earlier ones from the full rescan."""
+    data = b"x" * 100 + b"\n" + PH_TAIL + b"filler line\n" * (padding_after // 12)
+    ph = tmp_path / "ph.out"
+    ph.write_bytes(data)
+    assert pss.extract_lambda_from_ph(ph) == _reference(data)
+
+
+def test_extract_lambda_missing_raises(tmp_path):
+    ph = tmp_path / "ph.out"
+    ph.write_bytes(b"")
+    with pytest.raises(ValueError):
+        pss.extract_lambda_from_ph(ph)
+
+
+def test_dyn_slicing_matches_regex(tmp_path):
+    """The find/slice dyn0 parser returns the minimum the old regex found."""
+    data = (b"Dynamical matrix file\n\nq =    0.0000   0.0000   0.0000\n"
+            b"    freq(   1) =    -16.678000 [cm-1]\n"
+            b"    freq(   2) =    154.201660 [cm-1]\n"
+            b"freq (   3) =     12.34 [cm-1]\n")
+    dyn = tmp_path / "dyn0"
+    dyn.write_bytes(data)
+    expected = min(float(v) for v in
+                   re.findall(rb'freq\(\s*\d+\)\s*=\s*([-\d.]+)\s*\[cm-1\]', data))
+    assert pss.check_phonon_stability(dyn) == (expected >= 0, expected)
+
+
+def test_folder_cache_reuses_and_invalidates(tmp_path):
+    """A cached folder is reused until ph.out changes."""
+    folder = tmp_path / "strain_+1pc"
+    folder.mkdir()
+    ph = folder / "ph.out"
+    ph.write_bytes(PH_TAIL)
+
+    result, message, entry = pss._process_folder_cached(folder, {})
+    assert result['lambda'] == 0.84
+    cache = {folder.name: entry}
+    assert pss._process_folder_cached(folder, cache)[2] is entry
+
+    ph.write_bytes(PH_TAIL.replace(b"lambda =  0.8400", b"lambda =  0.91"))  # size changes too
+    result, _, new_entry = pss._process_folder_cached(folder, cache)
+    assert new_entry is not entry
+    assert result['lambda'] == 0.91